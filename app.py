@@ -1,7 +1,6 @@
 import os
 
 import dash
-import dash_bootstrap_components as dbc
 import dash_mantine_components as dmc
 from dash import Dash, dcc, html
 from icecream import install, ic
@@ -14,6 +13,12 @@ from utils.my_config_file import (
     ElementsIDs,
     Dimensions,
 )
+from utils.compression import init_compression
+from utils.load_test import init_recorder
+from utils.metrics import init_metrics
+from utils.profiler import init_profiler
+from utils.static_assets import SCRIPTS, STYLESHEETS, asset_urls, init_static_assets
+from utils.streaming import init_streaming
 from utils.website_text import app_name
 
 install()
@@ -28,25 +33,19 @@ app = Dash(
     __name__,
     title=app_name,
     update_title="Loading...",
-    external_stylesheets=[
-        dbc.themes.BOOTSTRAP,
-        "https://maxcdn.bootstrapcdn.com/font-awesome/4.7.0/css/font-awesome.min.css",
-        # include google fonts
-        "https://fonts.googleapis.com/css2?family=Inter:wght@100;200;300;400;500;900&display=swap",
-        # dash mantine stylesheets
-        "https://unpkg.com/@mantine/dates@7/styles.css",
-        "https://unpkg.com/@mantine/code-highlight@7/styles.css",
-        "https://unpkg.com/@mantine/charts@7/styles.css",
-        "https://unpkg.com/@mantine/carousel@7/styles.css",
-        "https://unpkg.com/@mantine/notifications@7/styles.css",
-        "https://unpkg.com/@mantine/nprogress@7/styles.css",
-    ],
-    external_scripts=["https://cdn.plot.ly/plotly-basic-2.26.2.min.js"],
+    external_stylesheets=asset_urls(STYLESHEETS),
+    external_scripts=asset_urls(SCRIPTS),
     prevent_initial_callbacks=True,
     use_pages=True,
-    serve_locally=False,
+    serve_locally=True,
 )
 app.config.suppress_callback_exceptions = True
+init_metrics(app)
+init_profiler(app)
+init_recorder(app)
+init_static_assets(app)
+init_compression(app)
+init_streaming(app)
 
 app.layout = dmc.MantineProvider(
     defaultColorScheme="light",
@@ -1,21 +1,38 @@
 import base64
+import functools
 import io
+import math
+import zlib
 from copy import deepcopy
 
 import dash_mantine_components as dmc
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-from pythermalcomfort.models import pmv, set_tmp, two_nodes, adaptive_ashrae
-from pythermalcomfort.utilities import v_relative, clo_dynamic
-from scipy import optimize
+import psychrolib
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from numba import njit
+from pythermalcomfort.models import (
+    set_tmp,
+    two_nodes,
+    adaptive_ashrae,
+    adaptive_en,
+    phs,
+)
+from pythermalcomfort.models.two_nodes import _two_nodes_optimized
+from pythermalcomfort.psychrometrics import p_sat_torr, t_o
+from pythermalcomfort.utilities import (
+    check_standard_compliance_array,
+    clo_dynamic,
+    v_relative,
+)
 
 from components.drop_down_inline import generate_dropdown_inline
-from utils.my_config_file import ElementsIDs, Models
+from components.solvers import bisect, pmv_still_air, solve_pmv
+from utils.my_config_file import Config, ElementsIDs, Models
+from utils.shared_cache import shared_cache
 from utils.website_text import TextHome
-import matplotlib
 
-matplotlib.use("Agg")
+psychrolib.SetUnitSystem(psychrolib.SI)
 
 
 def chart_selector(selected_model: str):
@@ -34,52 +51,108 @@ def chart_selector(selected_model: str):
     )
 
 
-# fig example
-def t_rh_pmv(inputs: dict = None, model: str = "iso"):
-    results = []
-    pmv_limits = [-0.5, 0.5]
+# the charts fill the width of their container, the image only needs as many
+# pixels as the container has on the screen of the user
+DPI_STEPS = (75, 100, 125, 150, 200, 250, 300)
+# used when the size of the container is not known, e.g. a laptop screen
+DEFAULT_PIXEL_WIDTH = 1200
+PIXEL_WIDTH_STEP = 100
+# the widest figures are 8 in wide, wider screens get the same images
+MAX_PIXEL_WIDTH = DPI_STEPS[-1] * 8
+
+
+def chart_resolution(display: dict = None):
+    # pixel width rounded up, so that similar screens share the cached charts.
+    # The values are sent by the browser, anything else than a positive number
+    # gives the default width
+    if not isinstance(display, dict) or not display:
+        return DEFAULT_PIXEL_WIDTH, True
+    try:
+        pixel_width = float(display.get("width", 0)) * float(display.get("dpr", 1))
+    except (TypeError, ValueError):
+        pixel_width = 0
+    if not math.isfinite(pixel_width) or pixel_width <= 0:
+        pixel_width = DEFAULT_PIXEL_WIDTH
+    pixel_width = min(pixel_width, MAX_PIXEL_WIDTH)
+    pixel_width = math.ceil(pixel_width / PIXEL_WIDTH_STEP) * PIXEL_WIDTH_STEP
+    return pixel_width, bool(display.get("webp", True))
+
+
+# vector charts below this size are sent as svg without trying a raster image
+SVG_MAX_TRANSFER_SIZE = 32_768
+
+
+def _encode(fig: Figure, savefig_kwargs: dict, **kwargs):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **kwargs, **savefig_kwargs)
+    return base64.b64encode(buffer.getvalue())
+
+
+def _transfer_size(encoded: bytes):
+    # the callback responses are compressed, which shrinks svg files a lot
+    # more than webp or png files
+    return len(zlib.compress(encoded, 1))
+
+
+def figure_to_image(
+    fig: Figure, alt: str, pixel_width: int, webp: bool, **savefig_kwargs
+):
+    # svg does not depend on the resolution and is the smallest format for
+    # line charts, the charts with many elements are sent as raster images
+    encoded = _encode(fig, savefig_kwargs, format="svg")
+    mime_type = "image/svg+xml"
+    if _transfer_size(encoded) > SVG_MAX_TRANSFER_SIZE:
+        needed_dpi = pixel_width / fig.get_size_inches()[0]
+        dpi = next((step for step in DPI_STEPS if step >= needed_dpi), DPI_STEPS[-1])
+        raster_format = "webp" if webp else "png"
+        # lossless, lossy compression blurs the lines and the text
+        raster_kwargs = {"pil_kwargs": {"lossless": True}} if webp else {}
+        raster = _encode(
+            fig, savefig_kwargs, format=raster_format, dpi=dpi, **raster_kwargs
+        )
+        if _transfer_size(raster) < _transfer_size(encoded):
+            encoded, mime_type = raster, f"image/{raster_format}"
+
+    return dmc.Image(
+        src=f"data:{mime_type};base64,{encoded.decode()}",
+        alt=alt,
+        py=0,
+    )
+
+
+# charts are drawn on Figure objects rather than with pyplot, whose global
+# "current figure" is not thread safe when the server uses several threads
+@shared_cache
+def t_rh_pmv(
+    inputs: dict = None,
+    model: str = "iso",
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    pmv_limits = np.array([-0.5, 0.5])
+    rh = np.arange(0, 110, 10)
     clo_d = clo_dynamic(
         clo=inputs[ElementsIDs.clo_input.value], met=inputs[ElementsIDs.met_input.value]
     )
     vr = v_relative(
         v=inputs[ElementsIDs.v_input.value], met=inputs[ElementsIDs.met_input.value]
     )
-    for pmv_limit in pmv_limits:
-        for rh in np.arange(0, 110, 10):
-
-            def function(x):
-                return (
-                    pmv(
-                        x,
-                        tr=inputs[ElementsIDs.t_r_input.value],
-                        vr=vr,
-                        rh=rh,
-                        met=inputs[ElementsIDs.met_input.value],
-                        clo=clo_d,
-                        wme=0,
-                        standard=model,
-                        limit_inputs=False,
-                    )
-                    - pmv_limit
-                )
-
-            temp = optimize.brentq(function, 10, 40)
-            results.append(
-                {
-                    "rh": rh,
-                    "temp": temp,
-                    "pmv_limit": pmv_limit,
-                }
-            )
-
-    df = pd.DataFrame(results)
-
-    f, axs = plt.subplots(1, 1, figsize=(6, 4), sharex=True)
-    t1 = df[df["pmv_limit"] == pmv_limits[0]]
-    t2 = df[df["pmv_limit"] == pmv_limits[1]]
-    axs.fill_betweenx(
-        t1["rh"], t1["temp"], t2["temp"], alpha=0.5, label=model, color="#7BD0F2"
+    # both boundaries at each relative humidity are solved in the same call
+    temp, _ = solve_pmv(
+        pmv_limits[:, np.newaxis],
+        "tdb",
+        standard=model,
+        bounds=(10, 40),
+        tr=inputs[ElementsIDs.t_r_input.value],
+        vr=vr,
+        rh=rh,
+        met=inputs[ElementsIDs.met_input.value],
+        clo=clo_d,
     )
+
+    f = Figure(figsize=(6, 4))
+    axs = f.subplots(1, 1, sharex=True)
+    axs.fill_betweenx(rh, temp[0], temp[1], alpha=0.5, label=model, color="#7BD0F2")
     axs.scatter(
         inputs[ElementsIDs.t_db_input.value],
         inputs[ElementsIDs.rh_input.value],
@@ -95,29 +168,569 @@ def t_rh_pmv(inputs: dict = None, model: str = "iso"):
     axs.grid(True, which="both", linestyle="--", linewidth=0.5)
     axs.spines["top"].set_visible(False)
     axs.spines["right"].set_visible(False)
-    plt.tight_layout()
+    f.tight_layout()
 
-    my_stringIObytes = io.BytesIO()
-    plt.savefig(
-        my_stringIObytes,
-        format="png",
+    return figure_to_image(
+        f,
+        "Heat stress chart",
+        pixel_width,
+        webp,
         transparent=True,
-        dpi=300,
         bbox_inches="tight",
         pad_inches=0,
     )
-    my_stringIObytes.seek(0)
-    my_base64_jpgData = base64.b64encode(my_stringIObytes.read()).decode()
-    plt.close("all")
-    return dmc.Image(
-        src=f"data:image/png;base64, {my_base64_jpgData}",
-        alt="Heat stress chart",
-        py=0,
+
+
+# psychrometric charts, the temperatures are in °C and the humidity ratio in g/kg
+PSYCHROMETRIC_TDB_RANGE = (10, 36)
+PSYCHROMETRIC_HR_RANGE = (0, 30)
+PSYCHROMETRIC_RH_LINES = np.arange(10, 110, 10)
+P_ATMOSPHERIC = 101325
+
+
+@functools.lru_cache(maxsize=None)
+def psychrometric_background():
+    # the saturation curve and the relative humidity lines do not depend on
+    # the inputs, they are only calculated once per process
+    tdb = np.linspace(*PSYCHROMETRIC_TDB_RANGE, 200)
+    hr = (
+        psychrolib.GetHumRatioFromRelHum(
+            tdb[np.newaxis, :],
+            PSYCHROMETRIC_RH_LINES[:, np.newaxis] / 100,
+            P_ATMOSPHERIC,
+        )
+        * 1000
+    )
+    return tdb, hr
+
+
+def _draw_psychrometric_background(ax, xlabel: str):
+    tdb, hr = psychrometric_background()
+    for rh, line in zip(PSYCHROMETRIC_RH_LINES, hr):
+        saturation = rh == 100
+        ax.plot(
+            tdb,
+            line,
+            color="black" if saturation else "grey",
+            linewidth=1 if saturation else 0.5,
+        )
+        # label each line where it leaves the chart
+        visible = np.flatnonzero(line <= PSYCHROMETRIC_HR_RANGE[1])[-1]
+        ax.annotate(
+            f"{rh}%",
+            (tdb[visible], line[visible]),
+            fontsize=7,
+            color="grey",
+            xytext=(2, -8),
+            textcoords="offset points",
+        )
+    ax.set(
+        xlabel=xlabel,
+        ylabel="Humidity ratio [g/kg]",
+        xlim=PSYCHROMETRIC_TDB_RANGE,
+        ylim=PSYCHROMETRIC_HR_RANGE,
+    )
+    ax.grid(True, linestyle="--", linewidth=0.5)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+
+
+def _comfort_polygon(tdb_low, tdb_high, hr):
+    # the cold boundary from the bottom to the top and back along the warm one
+    valid = ~np.isnan(tdb_low) & ~np.isnan(tdb_high)
+    x = np.concatenate([tdb_low[valid], tdb_high[valid][::-1]])
+    y = np.concatenate([hr[0][valid], hr[1][valid][::-1]])
+    return x, y
+
+
+@shared_cache
+def psychrometric_pmv(
+    inputs: dict = None,
+    model: str = "iso",
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    met = inputs[ElementsIDs.met_input.value]
+    clo_d = clo_dynamic(clo=inputs[ElementsIDs.clo_input.value], met=met)
+    vr = v_relative(v=inputs[ElementsIDs.v_input.value], met=met)
+    tr = inputs[ElementsIDs.t_r_input.value]
+
+    # both boundaries (PMV = -0.5 and +0.5) are solved in the same call
+    rh = np.tile(np.arange(0, 105, 5, dtype=float), 2)
+    pmv_limits = np.repeat([-0.5, 0.5], rh.size // 2)
+    tdb, _ = solve_pmv(
+        pmv_limits,
+        "tdb",
+        standard=model,
+        bounds=PSYCHROMETRIC_TDB_RANGE,
+        tr=tr,
+        vr=vr,
+        rh=rh,
+        met=met,
+        clo=clo_d,
+    )
+    hr = psychrolib.GetHumRatioFromRelHum(np.nan_to_num(tdb), rh / 100, P_ATMOSPHERIC)
+    tdb, hr = tdb.reshape(2, -1), hr.reshape(2, -1) * 1000
+
+    f = Figure(figsize=(6, 4))
+    ax = f.subplots()
+    _draw_psychrometric_background(ax, "Dry-bulb temperature [°C]")
+    ax.fill(*_comfort_polygon(tdb[0], tdb[1], hr), color="#7BD0F2", alpha=0.5)
+    t_db = inputs[ElementsIDs.t_db_input.value]
+    ax.scatter(
+        t_db,
+        psychrolib.GetHumRatioFromRelHum(
+            t_db, inputs[ElementsIDs.rh_input.value] / 100, P_ATMOSPHERIC
+        )
+        * 1000,
+        color="red",
+        zorder=3,
+    )
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "Psychrometric chart",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
+    )
+
+
+@shared_cache
+def psychrometric_operative_pmv(
+    inputs: dict = None,
+    model: str = "iso",
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    met = inputs[ElementsIDs.met_input.value]
+    clo_d = clo_dynamic(clo=inputs[ElementsIDs.clo_input.value], met=met)
+    v = inputs[ElementsIDs.v_input.value]
+    vr = v_relative(v=v, met=met)
+
+    # for each humidity ratio of the grid, the operative temperatures (DBT =
+    # MRT) of both boundaries are solved in the same call
+    hr = np.tile(np.linspace(*PSYCHROMETRIC_HR_RANGE, 31), 2)
+    pmv_limits = np.repeat([-0.5, 0.5], hr.size // 2)
+
+    def relative_humidity(t):
+        # supersaturated points are outside the chart, see t_dew below
+        rh = psychrolib.GetRelHumFromHumRatio(t, hr / 1000, P_ATMOSPHERIC) * 100
+        return np.minimum(rh, 100)
+
+    # the cooling effect of all the points is solved together at each step
+    t_op = bisect(
+        lambda t: pmv_still_air(
+            t, t, vr, relative_humidity(t), met, clo_d, standard=model
+        )
+        - pmv_limits,
+        *PSYCHROMETRIC_TDB_RANGE,
+        hr.size,
+    )
+    t_op, hr = t_op.reshape(2, -1), hr.reshape(2, -1)
+    # the comfort zone is bounded by the saturation curve, i.e. the dew point
+    t_dew = psychrolib.GetTDewPointFromHumRatio(
+        PSYCHROMETRIC_TDB_RANGE[1], hr[0] / 1000, P_ATMOSPHERIC
+    )
+    t_op[0] = np.where(t_op[0] < t_dew, t_dew, t_op[0])
+    t_op[1] = np.where(t_op[1] < t_dew, np.nan, t_op[1])
+
+    f = Figure(figsize=(6, 4))
+    ax = f.subplots()
+    _draw_psychrometric_background(ax, "Operative temperature [°C]")
+    ax.fill(*_comfort_polygon(t_op[0], t_op[1], hr), color="#7BD0F2", alpha=0.5)
+    t_db = inputs[ElementsIDs.t_db_input.value]
+    ax.scatter(
+        t_o(tdb=t_db, tr=inputs[ElementsIDs.t_r_input.value], v=v),
+        psychrolib.GetHumRatioFromRelHum(
+            t_db, inputs[ElementsIDs.rh_input.value] / 100, P_ATMOSPHERIC
+        )
+        * 1000,
+        color="red",
+        zorder=3,
+    )
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "Psychrometric chart (operative temperature)",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
+    )
+
+
+AIR_SPEED_TOP_RANGE = (15, 35)
+AIR_SPEED_V_RANGE = (0, 2)
+
+
+@shared_cache
+def air_speed_pmv_grid(
+    rh: float,
+    met: float,
+    clo: float,
+    model: str,
+    resolution: int = Config.AIR_SPEED_CHART_RESOLUTION.value,
+):
+    # the comfort zone does not depend on tdb and tr, only the marker does
+    t_op, v = np.meshgrid(
+        np.linspace(*AIR_SPEED_TOP_RANGE, resolution),
+        np.linspace(*AIR_SPEED_V_RANGE, resolution),
+    )
+    # the cooling effect of the whole grid is solved in one call
+    values = pmv_still_air(
+        t_op.ravel(),
+        t_op.ravel(),
+        v_relative(v=v, met=met).ravel(),
+        rh,
+        met,
+        clo_dynamic(clo=clo, met=met),
+        standard=model,
+    )
+    return t_op, v, values.reshape(t_op.shape)
+
+
+@shared_cache
+def air_speed_operative_pmv(
+    inputs: dict = None,
+    model: str = "iso",
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    t_op, v, values = air_speed_pmv_grid(
+        inputs[ElementsIDs.rh_input.value],
+        inputs[ElementsIDs.met_input.value],
+        inputs[ElementsIDs.clo_input.value],
+        model,
+    )
+
+    f = Figure(figsize=(6, 4))
+    ax = f.subplots()
+    # the boundaries are extracted from the grid with marching squares
+    ax.contourf(t_op, v, values, levels=[-0.5, 0.5], colors="#7BD0F2", alpha=0.5)
+    ax.contour(
+        t_op,
+        v,
+        values,
+        levels=[-0.5, 0.5],
+        colors="#1C7ED6",
+        linewidths=1,
+        linestyles="solid",
+    )
+    ax.scatter(
+        t_o(
+            tdb=inputs[ElementsIDs.t_db_input.value],
+            tr=inputs[ElementsIDs.t_r_input.value],
+            v=inputs[ElementsIDs.v_input.value],
+        ),
+        inputs[ElementsIDs.v_input.value],
+        color="red",
+        zorder=3,
+    )
+    ax.set(
+        xlabel="Operative temperature [°C]",
+        ylabel="Air speed [m/s]",
+        xlim=AIR_SPEED_TOP_RANGE,
+        ylim=AIR_SPEED_V_RANGE,
+    )
+    ax.grid(True, linestyle="--", linewidth=0.5)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "Air speed chart",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
+    )
+
+
+FANS_HEAT_TDB_RANGE = (30, 50)
+FANS_HEAT_V_RANGE = (0.1, 4.5)
+# still air, the core temperature with a fan is compared to this air speed
+FANS_HEAT_STILL_AIR = FANS_HEAT_V_RANGE[0]
+FANS_HEAT_REGIONS = {
+    "No heat strain": "#B2F2BB",
+    "Heat strain, fan beneficial": "#FFD8A8",
+    "Heat strain, fan detrimental": "#FF8787",
+}
+
+
+# same parameters as use_fans_heatwaves of pythermalcomfort
+FANS_HEAT_MAX_SKIN_BLOOD_FLOW = 80
+FANS_HEAT_MAX_SWEATING = 500
+
+
+@njit
+def _two_nodes_loop(tdb, tr, v, met, clo, vapor_pressure):
+    # use_fans_heatwaves calls the two-node kernel through np.vectorize, one
+    # Python call per scenario, the loop over the scenarios is compiled here
+    outputs = np.empty((6, tdb.size))
+    for index in range(tdb.size):
+        results = _two_nodes_optimized(
+            tdb[index],
+            tr[index],
+            v[index],
+            met[index],
+            clo[index],
+            vapor_pressure[index],
+            0.0,
+            1.8258,
+            101325.0,
+            "standing",
+            False,
+            FANS_HEAT_MAX_SKIN_BLOOD_FLOW,
+            FANS_HEAT_MAX_SWEATING,
+            False,
+        )
+        # t_core, t_skin, m_bl, m_rsw, w and w_max
+        for output in range(6):
+            outputs[output, index] = results[7 + output]
+    return outputs
+
+
+def fans_heat(tdb, tr, v, rh, met, clo, limit_inputs: bool = True):
+    # same outputs as use_fans_heatwaves, unrounded
+    tdb, tr, v, rh, met, clo = (
+        np.asarray(value, dtype=float)
+        for value in np.broadcast_arrays(tdb, tr, v, rh, met, clo)
+    )
+    t_core, t_skin, m_bl, m_rsw, w, w_max = (
+        output.reshape(tdb.shape)
+        for output in _two_nodes_loop(
+            *(
+                value.ravel()
+                for value in (tdb, tr, v, met, clo, rh * p_sat_torr(tdb) / 100)
+            )
+        )
+    )
+    heat_strain = (
+        (m_bl == FANS_HEAT_MAX_SKIN_BLOOD_FLOW)
+        | (w == w_max)
+        | (m_rsw == FANS_HEAT_MAX_SWEATING)
+    )
+    outputs = {"t_core": t_core, "t_skin": t_skin, "w": w, "heat_strain": heat_strain}
+    if limit_inputs:
+        # like use_fans_heatwaves, the relative humidity is not checked
+        tdb_valid, tr_valid, v_valid, _, met_valid, clo_valid = (
+            check_standard_compliance_array(
+                standard="fan_heatwaves", tdb=tdb, tr=tr, v=v, rh=rh, met=met, clo=clo
+            )
+        )
+        valid = ~np.isnan(tdb_valid + tr_valid + v_valid + met_valid + clo_valid)
+        outputs = {
+            name: np.where(valid, value, np.nan) for name, value in outputs.items()
+        }
+    return outputs
+
+
+@shared_cache
+def fans_heat_grid(
+    rh: float,
+    met: float,
+    clo: float,
+    resolution: int = Config.FANS_HEAT_CHART_RESOLUTION.value,
+):
+    # the regions do not depend on tdb, tr and v, only the marker does. The
+    # whole grid is solved by the two-node model in a single call, the first
+    # row is the still air reference
+    tdb, v = np.meshgrid(
+        np.linspace(*FANS_HEAT_TDB_RANGE, resolution),
+        np.linspace(*FANS_HEAT_V_RANGE, resolution),
+    )
+    results = fans_heat(tdb, tdb, v, rh, met, clo, limit_inputs=False)
+    t_core = results["t_core"]
+    regions = np.where(results["heat_strain"], np.where(t_core > t_core[0], 2, 1), 0)
+    return tdb, v, regions
+
+
+@shared_cache
+def fans_heat_chart(
+    inputs: dict = None,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    tdb, v, regions = fans_heat_grid(
+        inputs[ElementsIDs.rh_input.value],
+        inputs[ElementsIDs.met_input.value],
+        inputs[ElementsIDs.clo_input.value],
+    )
+
+    f = Figure(figsize=(6, 4))
+    ax = f.subplots()
+    colors = list(FANS_HEAT_REGIONS.values())
+    ax.contourf(
+        tdb,
+        v,
+        regions,
+        levels=np.arange(len(colors) + 1) - 0.5,
+        colors=colors,
+    )
+    ax.scatter(
+        inputs[ElementsIDs.t_db_input.value],
+        inputs[ElementsIDs.v_input.value],
+        color="black",
+        zorder=3,
+    )
+    ax.set(
+        xlabel="Air temperature [°C]",
+        ylabel="Air speed [m/s]",
+        xlim=FANS_HEAT_TDB_RANGE,
+        ylim=FANS_HEAT_V_RANGE,
+    )
+    ax.grid(True, linestyle="--", linewidth=0.5)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.legend(
+        [Patch(color=color) for color in colors],
+        list(FANS_HEAT_REGIONS),
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.15),
+        frameon=False,
+        ncol=3,
+    )
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "Fans and heat chart",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
+    )
+
+
+THL_TDB_RANGE = (10, 40)
+THL_COMPONENTS = {
+    "skin_diffusion": ("Water vapour diffusion through the skin", "#F59F00"),
+    "sweating": ("Evaporation of sweat", "#E03131"),
+    "respiration_latent": ("Respiration latent", "#7048E8"),
+    "respiration_sensible": ("Respiration sensible", "#AE3EC9"),
+    "radiation": ("Radiation from clothing surface", "#1C7ED6"),
+    "convection": ("Convection from clothing surface", "#37B24D"),
+}
+
+
+def pmv_heat_losses(tdb, tr, vr, rh, met, clo, wme=0, max_iterations=150):
+    # the heat balance of pythermalcomfort's PMV model evaluated with arrays,
+    # the clothing temperature iteration runs until all the points converged
+    tdb = np.asarray(tdb, dtype=float)
+    pa = rh * 10 * np.exp(16.6536 - 4030.183 / (tdb + 235))
+    icl = 0.155 * clo
+    m = met * 58.15
+    mw = m - wme * 58.15
+    f_cl = 1 + 1.29 * icl if icl <= 0.078 else 1.05 + 0.645 * icl
+
+    hcf = 12.1 * np.sqrt(vr)
+    taa = tdb + 273
+    tra = tr + 273
+    p1 = icl * f_cl
+    p2 = p1 * 3.96
+    p3 = p1 * 100
+    p4 = p1 * taa
+    p5 = (308.7 - 0.028 * mw) + p2 * (tra / 100.0) ** 4
+    xn = (taa + (35.5 - tdb) / (3.5 * icl + 0.1)) / 100
+    xf = xn / 2
+    hc = np.full_like(tdb, hcf)
+    for _ in range(max_iterations):
+        if np.all(np.abs(xn - xf) <= 0.00015):
+            break
+        xf = (xf + xn) / 2
+        hc = np.maximum(hcf, 2.38 * np.abs(100.0 * xf - taa) ** 0.25)
+        xn = (p5 + p4 * hc - p2 * xf**4) / (100 + p3 * hc)
+    tcl = 100 * xn - 273
+
+    losses = {
+        "skin_diffusion": 3.05 * 0.001 * (5733 - 6.99 * mw - pa),
+        "sweating": np.full_like(tdb, 0.42 * max(mw - 58.15, 0)),
+        "respiration_latent": 1.7 * 0.00001 * m * (5867 - pa),
+        "respiration_sensible": 0.0014 * m * (34 - tdb),
+        "radiation": 3.96 * f_cl * (xn**4 - (tra / 100.0) ** 4),
+        "convection": f_cl * hc * (tcl - tdb),
+    }
+    ts = 0.303 * np.exp(-0.036 * m) + 0.028
+    losses["pmv"] = ts * (mw - sum(losses[name] for name in THL_COMPONENTS))
+    return losses
+
+
+@shared_cache
+def thl_heat_losses(tr: float, vr: float, rh: float, met: float, clo: float):
+    # the curves do not depend on tdb, only the marker does
+    tdb = np.arange(THL_TDB_RANGE[0], THL_TDB_RANGE[1] + 0.1, 0.1)
+    return tdb, pmv_heat_losses(tdb, tr=tr, vr=vr, rh=rh, met=met, clo=clo)
+
+
+@shared_cache
+def thl_psychrometric_pmv(
+    inputs: dict = None,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    met = inputs[ElementsIDs.met_input.value]
+    tdb, losses = thl_heat_losses(
+        tr=inputs[ElementsIDs.t_r_input.value],
+        vr=float(v_relative(v=inputs[ElementsIDs.v_input.value], met=met)),
+        rh=inputs[ElementsIDs.rh_input.value],
+        met=met,
+        clo=float(clo_dynamic(clo=inputs[ElementsIDs.clo_input.value], met=met)),
+    )
+
+    f = Figure(figsize=(8, 5))
+    ax = f.subplots()
+    for name, (label, color) in THL_COMPONENTS.items():
+        ax.plot(tdb, losses[name], label=label, color=color)
+    ax.plot(
+        tdb,
+        sum(losses[name] for name in THL_COMPONENTS),
+        label="Total heat loss",
+        color="black",
+    )
+    ax.axvline(inputs[ElementsIDs.t_db_input.value], color="red", linestyle="--")
+    ax.set(
+        xlabel="Dry-bulb air temperature [°C]",
+        ylabel="Heat loss [W/m²]",
+        xlim=THL_TDB_RANGE,
+    )
+    ax.grid(True, linestyle="--", linewidth=0.5)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.legend(
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.15),
+        frameon=False,
+        ncol=2,
+    )
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "Thermal heat losses chart",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
     )
 
 
+@shared_cache
 def SET_outputs_chart(
-    inputs: dict = None, calculate_ce: bool = False, p_atmospheric: int = 101325
+    inputs: dict = None,
+    calculate_ce: bool = False,
+    p_atmospheric: int = 101325,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
 ):
     # Dry-bulb air temperature (x-axis)
     tdb_values = np.arange(10, 40, 0.5, dtype=float).tolist()
@@ -225,7 +838,8 @@ def SET_outputs_chart(
         )
 
     # Create the figure and axis
-    fig, ax1 = plt.subplots(figsize=(8, 6))
+    fig = Figure(figsize=(8, 6))
+    ax1 = fig.subplots()
 
     # Plot temperature-related variables on the left y-axis
     ax1.plot(tdb_values, set_temp, label="SET temperature", color="blue")
@@ -293,106 +907,192 @@ def SET_outputs_chart(
     )
 
     # Apply a tight layout
-    plt.tight_layout()
+    fig.tight_layout()
 
-    # Save the plot as an image in memory
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format="png", dpi=300)
-    buffer.seek(0)
-    img_base64 = base64.b64encode(buffer.read()).decode()
-    plt.close()
+    return figure_to_image(fig, "SET Outputs Chart", pixel_width, webp)
 
-    return dmc.Image(
-        src=f"data:image/png;base64,{img_base64}", alt="SET Outputs Chart", py=0
-    )
-
-
-def pmot_ot_adaptive_ashrae(inputs: dict = None, model: str = "ashrae"):
-    results = []
-    air_temperature = inputs[ElementsIDs.t_db_input.value]  # Air Temperature
-    mean_radiant_temp = inputs[ElementsIDs.t_r_input.value]  # Mean Radiant Temperature
-    prevailing_mean_outdoor_temp = inputs[
-        ElementsIDs.t_rm_input.value
-    ]  # Prevailing Mean Outdoor Temperature
-    air_speed = inputs[ElementsIDs.v_input.value]  # Air Speed
-    units = inputs[ElementsIDs.UNIT_TOGGLE.value]  # unit（IP or SI）
-    operative_temperature = (
-        air_temperature + mean_radiant_temp
-    ) / 2  # I do not know how to calculate 'operative_temperature', and assume it equals (air_temperature + mean_radiant_temp) / 2
-    outdoor_temp_range = np.arange(
-        10, 36, 1
-    )  # the range of outdoor_temp_range is (10, 35)
-
-    # Traverse the temperature range and calculate the corresponding comfort range
-    for t_running_mean in outdoor_temp_range:
-        adaptive = adaptive_ashrae(
-            tdb=air_temperature,
-            tr=mean_radiant_temp,
-            t_running_mean=t_running_mean,
-            v=air_speed,
-        )
-        results.append(
-            {
-                "prevailing_mean_outdoor_temp": t_running_mean,
-                "tmp_cmf_80_low": round(adaptive.tmp_cmf_80_low, 2),
-                "tmp_cmf_80_up": round(adaptive.tmp_cmf_80_up, 2),
-                "tmp_cmf_90_low": round(adaptive.tmp_cmf_90_low, 2),
-                "tmp_cmf_90_up": round(adaptive.tmp_cmf_90_up, 2),
-            }
-        )
 
-    df = pd.DataFrame(results)
+ADAPTIVE_TRM_RANGE = (10, 33.5)
+# pythermalcomfort rounds the comfort temperature to 0.1 °C, a finer axis shows
+# the rounding as steps along the bands
+ADAPTIVE_TRM = np.append(np.arange(*ADAPTIVE_TRM_RANGE), ADAPTIVE_TRM_RANGE[1])
+# the elevated air speed only raises the upper limits when the operative
+# temperature is at least 25 °C, the bands are calculated at one operative
+# temperature on each side of this threshold
+ADAPTIVE_COOLING_T_OP = 25
+ADAPTIVE_NO_COOLING_T_OP = 20
+# standard used for the operative temperature, bands from the widest to the narrowest
+ADAPTIVE_MODELS = {
+    "ashrae": (
+        "ashrae",
+        {
+            "80% Acceptability": ("tmp_cmf_80_low", "tmp_cmf_80_up", "lightblue"),
+            "90% Acceptability": ("tmp_cmf_90_low", "tmp_cmf_90_up", "blue"),
+        },
+    ),
+    "en": (
+        "iso",
+        {
+            "Category III": ("tmp_cmf_cat_iii_low", "tmp_cmf_cat_iii_up", "#D0EBFF"),
+            "Category II": ("tmp_cmf_cat_ii_low", "tmp_cmf_cat_ii_up", "#74C0FC"),
+            "Category I": ("tmp_cmf_cat_i_low", "tmp_cmf_cat_i_up", "#1C7ED6"),
+        },
+    ),
+}
+
+
+@shared_cache
+def adaptive_bands(model: str, v: float, cooling: bool):
+    # the bands only depend on the air speed and on the cooling effect being
+    # applied, all the running mean temperatures are calculated in one call
+    t_op = ADAPTIVE_COOLING_T_OP if cooling else ADAPTIVE_NO_COOLING_T_OP
+    if model == "ashrae":
+        results = adaptive_ashrae(
+            tdb=t_op, tr=t_op, t_running_mean=ADAPTIVE_TRM, v=v
+        ).__dict__
+    else:
+        results = adaptive_en(tdb=t_op, tr=t_op, t_running_mean=ADAPTIVE_TRM, v=v)
+    return {
+        name: (results[low], results[up])
+        for name, (low, up, _) in ADAPTIVE_MODELS[model][1].items()
+    }
 
-    # Create image
-    fig, ax = plt.subplots(figsize=(6, 4))
 
-    # Draw blue areas with 80% and 90% acceptance ranges
-    ax.fill_between(
-        df["prevailing_mean_outdoor_temp"],
-        df["tmp_cmf_80_low"],
-        df["tmp_cmf_80_up"],
-        color="lightblue",
-        label="80% Acceptability",
+@shared_cache
+def pmot_ot_adaptive(
+    inputs: dict = None,
+    model: str = "ashrae",
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    standard, band_colors = ADAPTIVE_MODELS[model]
+    v = inputs[ElementsIDs.v_input.value]
+    operative_temperature = t_o(
+        tdb=inputs[ElementsIDs.t_db_input.value],
+        tr=inputs[ElementsIDs.t_r_input.value],
+        v=v,
+        standard=standard,
     )
-    ax.fill_between(
-        df["prevailing_mean_outdoor_temp"],
-        df["tmp_cmf_90_low"],
-        df["tmp_cmf_90_up"],
-        color="blue",
-        label="90% Acceptability",
+    bands = adaptive_bands(
+        model, v, bool(operative_temperature >= ADAPTIVE_COOLING_T_OP)
     )
 
-    # Draw red dots：Operative Temperature and Prevailing Mean Outdoor Temperature
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+
+    for name, (low, up) in bands.items():
+        ax.fill_between(ADAPTIVE_TRM, low, up, color=band_colors[name][2], label=name)
+
+    # Draw red dots: Operative Temperature and Prevailing Mean Outdoor Temperature
     ax.scatter(
-        prevailing_mean_outdoor_temp,
+        inputs[ElementsIDs.t_rm_input.value],
         operative_temperature,
         color="red",
         label="Current Condition",
     )
 
     # Set the axis label and range
+    low, up = next(iter(bands.values()))
     ax.set_xlabel("Prevailing Mean Outdoor Temperature (°C)")
     ax.set_ylabel("Operative Temperature (°C)")
-    ax.set_xlim(10, 35)
-    ax.set_ylim(df["tmp_cmf_80_low"].min(), df["tmp_cmf_80_up"].max())
+    ax.set_xlim(*ADAPTIVE_TRM_RANGE)
+    ax.set_ylim(np.nanmin(low), np.nanmax(up))
 
     # Displays legends and grids
     ax.legend()
     ax.grid(True)
 
-    plt.tight_layout()
+    fig.tight_layout()
+
+    return figure_to_image(
+        fig, "Adaptive chart", pixel_width, webp, bbox_inches="tight"
+    )
 
-    # Save the image as base64 encoding
-    my_stringIObytes = io.BytesIO()
-    plt.savefig(my_stringIObytes, format="png", dpi=300, bbox_inches="tight")
-    my_stringIObytes.seek(0)
-    my_base64_jpgData = base64.b64encode(my_stringIObytes.read()).decode()
 
-    # Close the currently drawn image to prevent memory leaks
-    plt.close(fig)
+# PHS model of a standing subject, the metabolic rate input is in met
+PHS_POSTURE = 2
+MET_TO_W_M2 = 58.15
+# the exposure is sampled at this number of times. pythermalcomfort's phs only
+# returns the state at the end of the exposure, so each time is integrated
+# minute by minute from the start, with one call of the jitted model per time
+# (about 10 ms for the 97 times of an 8 h exposure)
+PHS_CHART_POINTS = 97
+PHS_T_RE_LIMIT = 38
+PHS_WEIGHT = 75
+# fraction of the body mass, for 95% of the working population and a mean subject
+PHS_WATER_LOSS_LIMITS = (0.05, 0.075)
 
-    return dmc.Image(
-        src=f"data:image/png;base64, {my_base64_jpgData}",
-        alt="Adaptive chart",
-        py=0,
+
+def phs_exposure(inputs: dict, duration):
+    return phs(
+        tdb=inputs[ElementsIDs.t_db_input.value],
+        tr=inputs[ElementsIDs.t_r_input.value],
+        v=inputs[ElementsIDs.v_input.value],
+        rh=inputs[ElementsIDs.rh_input.value],
+        met=np.multiply(inputs[ElementsIDs.met_input.value], MET_TO_W_M2),
+        clo=inputs[ElementsIDs.clo_input.value],
+        posture=PHS_POSTURE,
+        duration=np.asarray(duration, dtype=int),
+        weight=PHS_WEIGHT,
+        round=False,
+    )
+
+
+@shared_cache
+def phs_exposure_chart(
+    inputs: dict = None,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    duration = int(inputs[ElementsIDs.duration_input.value])
+    times = np.unique(
+        np.linspace(1, duration, min(duration, PHS_CHART_POINTS)).round().astype(int)
+    )
+    results = phs_exposure(inputs, times)
+    # state at the start of the exposure
+    times = np.insert(times, 0, 0)
+    t_re = np.insert(results["t_re"], 0, 36.8)
+    water_loss = np.insert(results["water_loss"], 0, 0)
+
+    f = Figure(figsize=(6, 4))
+    ax = f.subplots()
+    ax.plot(times, t_re, color="#E03131", label="Rectal temperature")
+    ax.axhline(PHS_T_RE_LIMIT, color="#E03131", linestyle="--", linewidth=1)
+    ax.set(
+        xlabel="Exposure time [min]",
+        ylabel="Rectal temperature [°C]",
+        xlim=(0, duration),
+        ylim=(36.5, max(PHS_T_RE_LIMIT, np.nanmax(t_re)) + 0.5),
+    )
+    ax.grid(True, linestyle="--", linewidth=0.5)
+    ax.spines["top"].set_visible(False)
+
+    ax_water = ax.twinx()
+    ax_water.plot(times, water_loss, color="#1C7ED6", label="Water loss")
+    for fraction in PHS_WATER_LOSS_LIMITS:
+        ax_water.axhline(
+            fraction * PHS_WEIGHT * 1000, color="#1C7ED6", linestyle="--", linewidth=1
+        )
+    ax_water.set(ylabel="Water loss [g]", ylim=(0, None))
+    ax_water.spines["top"].set_visible(False)
+
+    lines = ax.get_lines()[:1] + ax_water.get_lines()[:1]
+    ax.legend(
+        lines,
+        [line.get_label() for line in lines],
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.15),
+        frameon=False,
+        ncol=2,
+    )
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "PHS exposure chart",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
     )
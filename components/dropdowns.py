@@ -304,12 +304,24 @@ pmv_ashare_clothing_selection = {
 }
 
 
-def En16798_air_speed_selection():
-    return generate_dropdown_inputs_inline(adaptive_en_air_speed, clearable=False)
+def En16798_air_speed_selection(selected=None):
+    return generate_dropdown_inputs_inline(
+        {
+            **adaptive_en_air_speed,
+            "default": selected or adaptive_en_air_speed["default"],
+        },
+        clearable=False,
+    )
 
 
-def En16798_relative_humidity_selection():
-    return generate_dropdown_inputs_inline(pmv_en_humidity_selection, clearable=False)
+def En16798_relative_humidity_selection(selected=None):
+    return generate_dropdown_inputs_inline(
+        {
+            **pmv_en_humidity_selection,
+            "default": selected or pmv_en_humidity_selection["default"],
+        },
+        clearable=False,
+    )
 
 
 def En16798_relative_metabolic_selection():
@@ -348,9 +360,13 @@ def ashrae_speed_selection():
     return generate_dropdown_inputs_inline(pmv_ashrae_speed_selection, clearable=False)
 
 
-def ashrae_humidity_selection():
+def ashrae_humidity_selection(selected=None):
     return generate_dropdown_inputs_inline(
-        pmv_ashrae_humidity_selection, clearable=False
+        {
+            **pmv_ashrae_humidity_selection,
+            "default": selected or pmv_ashrae_humidity_selection["default"],
+        },
+        clearable=False,
     )
 
 
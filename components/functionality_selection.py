@@ -23,6 +23,18 @@ def functionality_selection():
                         "value": Functionalities.Ranges.value,
                         "label": Functionalities.Ranges.value,
                     },
+                    {
+                        "value": Functionalities.Uncertainty.value,
+                        "label": Functionalities.Uncertainty.value,
+                    },
+                    {
+                        "value": Functionalities.Sensitivity.value,
+                        "label": Functionalities.Sensitivity.value,
+                    },
+                    {
+                        "value": Functionalities.SensorGrid.value,
+                        "label": Functionalities.SensorGrid.value,
+                    },
                 ],
                 mb=10,
                 radius="lg",
@@ -1,15 +1,26 @@
+from copy import deepcopy
+
 import dash
 import dash_mantine_components as dmc
-from dash import html, callback, Output, Input, State
+from dash import html, callback, dcc, Output, Input, State
 
+from components.dropdowns import (
+    ashrae_humidity_selection,
+    En16798_air_speed_selection,
+    En16798_relative_humidity_selection,
+)
+from utils.humidity import humidity_input
 from utils.my_config_file import (
+    HumiditySelection,
     ModelInputsInfo,
     Models,
+    MyStores,
     convert_units,
     ElementsIDs,
     UnitSystem,
     MetabolicRateSelection,
     ClothingSelection,
+    Config,
 )
 from utils.website_text import (
     TextWarning,
@@ -18,6 +29,17 @@ import dash
 from components.show_results import display_results
 
 
+# humidity unit dropdown shown above the relative humidity input
+HUMIDITY_SELECTIONS = {
+    Models.PMV_ashrae.name: ashrae_humidity_selection,
+    Models.PMV_EN.name: En16798_relative_humidity_selection,
+}
+# air speed dropdown shown instead of the air speed input
+SPEED_SELECTIONS = {
+    Models.Adaptive_EN.name: En16798_air_speed_selection,
+}
+
+
 def modal_custom_ensemble():
     return dmc.Modal(
         title="Custom Ensemble",
@@ -308,7 +330,10 @@ def input_environmental_personal(
     url_params: dict = None,
 ):
     inputs = []
-    all_inputs = set()
+    all_inputs = {
+        ElementsIDs.HUMIDITY_SELECTION.value,
+        ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value,
+    }
 
     for model in Models:
         for input_info in model.value.inputs:
@@ -325,11 +350,41 @@ def input_environmental_personal(
             or values.id == ElementsIDs.clo_input.value
         ):
             inputs.append(create_autocomplete(values, url_params))
+        elif (
+            values.id == ElementsIDs.v_input.value
+            and selected_model in SPEED_SELECTIONS
+        ):
+            inputs.append(
+                SPEED_SELECTIONS[selected_model](
+                    (url_params or {}).get(
+                        ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value
+                    )
+                )
+            )
         else:
             # if the value is not in the URL params, use the default value
             default_value = (
                 url_params.get(values.id, values.value) if url_params else values.value
             )
+            if values.id == ElementsIDs.t_db_input.value:
+                t_db_value = default_value
+            if (
+                values.id == ElementsIDs.rh_input.value
+                and selected_model in HUMIDITY_SELECTIONS
+            ):
+                # the URL and the store hold the relative humidity, the input
+                # shows it in the selected humidity unit
+                humidity = (url_params or {}).get(
+                    ElementsIDs.HUMIDITY_SELECTION.value
+                ) or HumiditySelection.relative_humidity.value
+                inputs.append(HUMIDITY_SELECTIONS[selected_model](humidity))
+                values = humidity_input(
+                    values.model_copy(update={"value": default_value}),
+                    humidity,
+                    t_db_value,
+                    units,
+                )
+                default_value = values.value
 
             input_filed = dmc.NumberInput(
                 label=values.name + " (" + values.unit + ")",
@@ -339,9 +394,27 @@ def input_environmental_personal(
                 max=values.max,
                 step=values.step,
                 id=values.id,
+                debounce=Config.INPUT_DEBOUNCE.value,
             )
             inputs.append(input_filed)
 
+    # the store callback listens to the fields of all the models, the fields not
+    # used by the selected model are kept in the layout as hidden inputs. The
+    # met and clo fields are autocompletes, their callbacks also set the options
+    rendered_inputs = {values.id for values in model_inputs}
+    if selected_model in HUMIDITY_SELECTIONS:
+        rendered_inputs.add(ElementsIDs.HUMIDITY_SELECTION.value)
+    if selected_model in SPEED_SELECTIONS:
+        rendered_inputs.remove(ElementsIDs.v_input.value)
+        rendered_inputs.add(ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value)
+    for input_id in sorted(all_inputs - rendered_inputs):
+        if input_id in (ElementsIDs.met_input.value, ElementsIDs.clo_input.value):
+            inputs.append(
+                dmc.Autocomplete(id=input_id, data=[], style={"display": "none"})
+            )
+        else:
+            inputs.append(dcc.Input(id=input_id, type="hidden"))
+
     unit_toggle = dmc.Center(
         dmc.Switch(
             id=ElementsIDs.UNIT_TOGGLE.value,
@@ -441,6 +514,52 @@ def handle_modal(clo_value, _nc_open, _nc_close, _nc_submit, opened, selected_mo
     return opened, dash.no_update, "none", dash.no_update
 
 
+@callback(
+    Output(ElementsIDs.rh_input.value, "label"),
+    Output(ElementsIDs.rh_input.value, "description"),
+    Output(ElementsIDs.rh_input.value, "min"),
+    Output(ElementsIDs.rh_input.value, "max"),
+    Output(ElementsIDs.rh_input.value, "step"),
+    Output(ElementsIDs.rh_input.value, "value"),
+    Input(ElementsIDs.HUMIDITY_SELECTION.value, "value"),
+    State(MyStores.input_data.value, "data"),
+    State(ElementsIDs.MODEL_SELECTION.value, "value"),
+    State(ElementsIDs.UNIT_TOGGLE.value, "checked"),
+    prevent_initial_call=True,
+)
+def update_humidity_input(humidity, stored_inputs, selected_model, units_selection):
+    if humidity is None or selected_model not in HUMIDITY_SELECTIONS:
+        return (dash.no_update,) * 6
+    units = UnitSystem.IP.value if units_selection else UnitSystem.SI.value
+    model_inputs = {
+        values.id: values
+        for values in convert_units(
+            deepcopy(Models[selected_model].value.inputs), units
+        )
+    }
+    rh_input = model_inputs[ElementsIDs.rh_input.value]
+    t_db_value = model_inputs[ElementsIDs.t_db_input.value].value
+    # the last relative humidity submitted is shown in the new unit
+    if (
+        stored_inputs
+        and stored_inputs.get(ElementsIDs.MODEL_SELECTION.value) == selected_model
+        and stored_inputs.get(ElementsIDs.UNIT_TOGGLE.value) == units
+    ):
+        rh_input = rh_input.model_copy(
+            update={"value": stored_inputs[ElementsIDs.rh_input.value]}
+        )
+        t_db_value = stored_inputs[ElementsIDs.t_db_input.value]
+    values = humidity_input(rh_input, humidity, t_db_value, units)
+    return (
+        values.name + " (" + values.unit + ")",
+        f"From {values.min} to {values.max}",
+        values.min,
+        values.max,
+        values.step,
+        values.value,
+    )
+
+
 def create_autocomplete(values: ModelInputsInfo, url_params: dict):
     default_value = (
         url_params.get(values.id, values.value) if url_params else values.value
@@ -0,0 +1,463 @@
+from functools import partial
+from typing import Callable, Dict, Optional
+
+import dash_mantine_components as dmc
+import numpy as np
+from pydantic import BaseModel
+from pythermalcomfort.models import pmv_ppd, adaptive_ashrae, adaptive_en, set_tmp
+from pythermalcomfort.utilities import (
+    v_relative,
+    clo_dynamic,
+    mapping,
+    check_standard_compliance_array,
+)
+
+from components.charts import (
+    t_rh_pmv,
+    psychrometric_pmv,
+    psychrometric_operative_pmv,
+    air_speed_operative_pmv,
+    thl_psychrometric_pmv,
+    SET_outputs_chart,
+    pmot_ot_adaptive,
+    phs_exposure,
+    phs_exposure_chart,
+    fans_heat,
+    fans_heat_chart,
+    FANS_HEAT_STILL_AIR,
+)
+from components.solvers import cooling_effect, STILL_AIR_SPEED
+from components.uncertainty import pmv_uncertainty
+from utils.my_config_file import (
+    Charts,
+    ElementsIDs,
+    Models,
+    UnitConverter,
+    UnitSystem,
+)
+from utils.shared_cache import shared_cache
+
+SENSATIONS = {
+    -2.5: "Cold",
+    -1.5: "Cool",
+    -0.5: "Slightly Cool",
+    0.5: "Neutral",
+    1.5: "Slightly Warm",
+    2.5: "Warm",
+    10: "Hot",
+}
+
+
+class ModelEntry(BaseModel):
+    # arrays in, one value per scenario for each model input, named arrays out
+    compute: Callable
+    # components displaying the outputs of one scenario
+    format_results: Callable
+    columns: int
+    # chart name -> function(inputs, pixel_width, webp) drawing the chart
+    charts: Dict[str, Callable]
+    # components showing the distribution of the outputs of one scenario when
+    # its inputs are uncertain
+    uncertainty: Optional[Callable] = None
+    # output differentiated by the sensitivity functionality -> function
+    # computing it without rounding, the first one is used unless the selected
+    # chart shows another one
+    sensitivity: Dict[str, Callable] = {}
+    # chart name -> output shown by the chart
+    chart_outputs: Dict[str, str] = {}
+    # whether the PMV of an uploaded grid of sensors can be mapped
+    sensor_grid: bool = False
+
+
+def pmv_compute(inputs: dict, standard: str):
+    met = inputs[ElementsIDs.met_input.value]
+    tdb = inputs[ElementsIDs.t_db_input.value]
+    tr = inputs[ElementsIDs.t_r_input.value]
+    vr = v_relative(v=inputs[ElementsIDs.v_input.value], met=met)
+    rh = inputs[ElementsIDs.rh_input.value]
+    clo = clo_dynamic(clo=inputs[ElementsIDs.clo_input.value], met=met)
+    if standard == "ashrae":
+        # pythermalcomfort solves the cooling effect one scenario at a time,
+        # it is solved here for all the scenarios at once. The PMV in still air
+        # is the same for both standards, the ISO one does not solve it again,
+        # and the ASHRAE limits are checked on the actual inputs
+        ce = cooling_effect(tdb, tr, vr, rh, met, clo)
+        r_pmv = pmv_ppd(
+            tdb=tdb - ce,
+            tr=tr - ce,
+            vr=np.where(ce > 0, STILL_AIR_SPEED, vr),
+            rh=rh,
+            met=met,
+            clo=clo,
+            wme=0,
+            limit_inputs=False,
+            standard="iso",
+        )
+        valid = ~np.any(
+            np.isnan(
+                check_standard_compliance_array(
+                    standard, tdb=tdb, tr=tr, v=vr, met=met, clo=clo
+                )
+            ),
+            axis=0,
+        )
+        r_pmv = {name: np.where(valid, value, np.nan) for name, value in r_pmv.items()}
+    else:
+        r_pmv = pmv_ppd(
+            tdb=tdb,
+            tr=tr,
+            vr=vr,
+            rh=rh,
+            met=met,
+            clo=clo,
+            wme=0,
+            limit_inputs=True,
+            standard=standard,
+        )
+    return {
+        "pmv": r_pmv["pmv"],
+        "ppd": r_pmv["ppd"],
+        "sensation": mapping(r_pmv["pmv"], SENSATIONS),
+    }
+
+
+def set_compute(inputs: dict):
+    # same inputs as the SET chart
+    met = inputs[ElementsIDs.met_input.value]
+    return {
+        "set": set_tmp(
+            tdb=inputs[ElementsIDs.t_db_input.value],
+            tr=inputs[ElementsIDs.t_r_input.value],
+            v=v_relative(v=inputs[ElementsIDs.v_input.value], met=met),
+            rh=inputs[ElementsIDs.rh_input.value],
+            met=met,
+            clo=clo_dynamic(clo=inputs[ElementsIDs.clo_input.value], met=met),
+            wme=0,
+            limit_inputs=False,
+            round=False,
+        )
+    }
+
+
+def format_value(value, spec: str = ""):
+    # the models return nan for the inputs outside their limits
+    return "-" if np.isnan(value) else format(value, spec)
+
+
+def format_temperature(value, units: str, decimals: int = None):
+    # rounded in °C, as the value of the model, before the conversion
+    if decimals is not None:
+        value = np.around(value, decimals)
+    if units == UnitSystem.IP.value and not np.isnan(value):
+        value = round(UnitConverter.celsius_to_fahrenheit(value), 2)
+    return format_value(value)
+
+
+def pmv_results(outputs: dict, units: str):
+    return [
+        dmc.Center(dmc.Text(f"PMV: {outputs['pmv']}")),
+        dmc.Center(dmc.Text(f"PPD: {outputs['ppd']}")),
+        dmc.Center(dmc.Text(f"Sensation: {outputs['sensation']}")),
+    ]
+
+
+def adaptive_ashrae_compute(inputs: dict):
+    adaptive = adaptive_ashrae(
+        tdb=inputs[ElementsIDs.t_db_input.value],
+        tr=inputs[ElementsIDs.t_r_input.value],
+        t_running_mean=inputs[ElementsIDs.t_rm_input.value],
+        v=inputs[ElementsIDs.v_input.value],
+    )
+    return {
+        "tmp_cmf": adaptive.tmp_cmf,
+        "tmp_cmf_80_low": adaptive.tmp_cmf_80_low,
+        "tmp_cmf_80_up": adaptive.tmp_cmf_80_up,
+        "tmp_cmf_90_low": adaptive.tmp_cmf_90_low,
+        "tmp_cmf_90_up": adaptive.tmp_cmf_90_up,
+    }
+
+
+def adaptive_ashrae_results(outputs: dict, units: str):
+    outputs = {
+        name: format_temperature(value, units) for name, value in outputs.items()
+    }
+    return [
+        dmc.Center(dmc.Text(f"Comfort temperature: {outputs['tmp_cmf']}")),
+        dmc.Center(
+            dmc.Text(
+                f"Comfort range for 80% occupants: {outputs['tmp_cmf_80_low']} - {outputs['tmp_cmf_80_up']}"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(
+                f"Comfort range for 90% occupants: {outputs['tmp_cmf_90_low']} - {outputs['tmp_cmf_90_up']}"
+            )
+        ),
+    ]
+
+
+def adaptive_en_compute(inputs: dict):
+    adaptive = adaptive_en(
+        tdb=inputs[ElementsIDs.t_db_input.value],
+        tr=inputs[ElementsIDs.t_r_input.value],
+        t_running_mean=inputs[ElementsIDs.t_rm_input.value],
+        v=inputs[ElementsIDs.v_input.value],
+    )
+    return {
+        name: adaptive[name]
+        for name in (
+            "tmp_cmf",
+            "tmp_cmf_cat_i_low",
+            "tmp_cmf_cat_i_up",
+            "tmp_cmf_cat_ii_low",
+            "tmp_cmf_cat_ii_up",
+            "tmp_cmf_cat_iii_low",
+            "tmp_cmf_cat_iii_up",
+        )
+    }
+
+
+def adaptive_en_results(outputs: dict, units: str):
+    outputs = {
+        name: format_temperature(value, units) for name, value in outputs.items()
+    }
+    return [
+        dmc.Center(dmc.Text(f"Comfort temperature: {outputs['tmp_cmf']}")),
+        *(
+            dmc.Center(
+                dmc.Text(
+                    f"Comfort range for Category {category}: "
+                    f"{outputs[f'tmp_cmf_cat_{category.lower()}_low']} - "
+                    f"{outputs[f'tmp_cmf_cat_{category.lower()}_up']}"
+                )
+            )
+            for category in ("I", "II", "III")
+        ),
+    ]
+
+
+def phs_compute(inputs: dict):
+    # the outputs are rounded by phs_results, the sensitivity analysis
+    # compares the unrounded rectal temperature
+    results = phs_exposure(inputs, inputs[ElementsIDs.duration_input.value])
+    return {
+        name: results[name]
+        for name in (
+            "t_re",
+            "water_loss",
+            "d_lim_loss_95",
+            "d_lim_loss_50",
+            "d_lim_t_re",
+        )
+    }
+
+
+def phs_t_re(inputs: dict):
+    t_re = phs_exposure(inputs, inputs[ElementsIDs.duration_input.value])["t_re"]
+    return {"t_re": t_re}
+
+
+def phs_results(outputs: dict, units: str):
+    return [
+        dmc.Center(
+            dmc.Text(
+                f"Rectal temperature: {format_temperature(outputs['t_re'], units, 1)}"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(f"Water loss: {format_value(outputs['water_loss'], '.0f')} g")
+        ),
+        dmc.Center(
+            dmc.Text(
+                "Maximum allowable exposure time for water loss: "
+                f"{format_value(outputs['d_lim_loss_95'], '.0f')} min "
+                "(95% of the working population), "
+                f"{format_value(outputs['d_lim_loss_50'], '.0f')} min (mean subject)"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(
+                "Maximum allowable exposure time for heat storage: "
+                f"{format_value(outputs['d_lim_t_re'], '.0f')} min"
+            )
+        ),
+    ]
+
+
+def fans_heat_compute(inputs: dict):
+    # the scenarios and the same scenarios in still air are solved in one call
+    scenarios = [
+        inputs[ElementsIDs.t_db_input.value],
+        inputs[ElementsIDs.t_r_input.value],
+        inputs[ElementsIDs.v_input.value],
+        inputs[ElementsIDs.rh_input.value],
+        inputs[ElementsIDs.met_input.value],
+        inputs[ElementsIDs.clo_input.value],
+    ]
+    still_air = list(scenarios)
+    still_air[2] = np.full_like(scenarios[2], FANS_HEAT_STILL_AIR)
+    results = fans_heat(
+        *(np.concatenate([value, still]) for value, still in zip(scenarios, still_air))
+    )
+    size = len(scenarios[0])
+    # the outputs are rounded by fans_heat_results, the sensitivity analysis
+    # compares the unrounded core temperature
+    return {
+        "t_core": results["t_core"][:size],
+        "t_skin": results["t_skin"][:size],
+        "w": results["w"][:size],
+        "heat_strain": results["heat_strain"][:size],
+        "fan_beneficial": results["t_core"][:size] < results["t_core"][size:],
+    }
+
+
+def fans_heat_t_core(inputs: dict):
+    t_core = fans_heat(
+        inputs[ElementsIDs.t_db_input.value],
+        inputs[ElementsIDs.t_r_input.value],
+        inputs[ElementsIDs.v_input.value],
+        inputs[ElementsIDs.rh_input.value],
+        inputs[ElementsIDs.met_input.value],
+        inputs[ElementsIDs.clo_input.value],
+    )["t_core"]
+    return {"t_core": t_core}
+
+
+def fans_heat_results(outputs: dict, units: str):
+    return [
+        dmc.Center(
+            dmc.Text(
+                f"Core temperature: {format_temperature(outputs['t_core'], units, 1)}"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(
+                f"Skin temperature: {format_temperature(outputs['t_skin'], units, 1)}"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(f"Skin wettedness: {format_value(np.around(outputs['w'], 2))}")
+        ),
+        dmc.Center(
+            dmc.Text(f"Heat strain: {'Yes' if outputs['heat_strain'] else 'No'}")
+        ),
+        dmc.Center(
+            dmc.Text(
+                "Fan: "
+                + ("beneficial" if outputs["fan_beneficial"] else "not beneficial")
+            )
+        ),
+    ]
+
+
+def pmv_charts(model: str):
+    return {
+        Charts.t_rh.value.name: partial(t_rh_pmv, model=model),
+        Charts.psychrometric.value.name: partial(psychrometric_pmv, model=model),
+        Charts.psychrometric_operative.value.name: partial(
+            psychrometric_operative_pmv, model=model
+        ),
+        Charts.wind_temp_chart.value.name: partial(
+            air_speed_operative_pmv, model=model
+        ),
+        Charts.thl_psychrometric.value.name: partial(thl_psychrometric_pmv),
+        Charts.set_outputs.value.name: partial(SET_outputs_chart),
+    }
+
+
+MODEL_REGISTRY = {
+    Models.PMV_ashrae.name: ModelEntry(
+        compute=partial(pmv_compute, standard="ashrae"),
+        format_results=pmv_results,
+        columns=3,
+        charts=pmv_charts("ashrae"),
+        uncertainty=partial(
+            pmv_uncertainty, selected_model=Models.PMV_ashrae.name, standard="ashrae"
+        ),
+        sensitivity={
+            "pmv": partial(pmv_compute, standard="ashrae"),
+            "set": set_compute,
+        },
+        chart_outputs={Charts.set_outputs.value.name: "set"},
+        sensor_grid=True,
+    ),
+    Models.PMV_EN.name: ModelEntry(
+        compute=partial(pmv_compute, standard="ISO"),
+        format_results=pmv_results,
+        columns=3,
+        charts=pmv_charts("iso"),
+        uncertainty=partial(
+            pmv_uncertainty, selected_model=Models.PMV_EN.name, standard="iso"
+        ),
+        sensitivity={
+            "pmv": partial(pmv_compute, standard="ISO"),
+            "set": set_compute,
+        },
+        chart_outputs={Charts.set_outputs.value.name: "set"},
+        sensor_grid=True,
+    ),
+    Models.Adaptive_ASHRAE.name: ModelEntry(
+        compute=adaptive_ashrae_compute,
+        format_results=adaptive_ashrae_results,
+        columns=1,
+        sensitivity={"tmp_cmf": adaptive_ashrae_compute},
+        charts={
+            Charts.pmot_ot.value.name: partial(pmot_ot_adaptive, model="ashrae"),
+        },
+    ),
+    Models.Adaptive_EN.name: ModelEntry(
+        compute=adaptive_en_compute,
+        format_results=adaptive_en_results,
+        columns=1,
+        sensitivity={"tmp_cmf": adaptive_en_compute},
+        charts={
+            Charts.pmot_ot.value.name: partial(pmot_ot_adaptive, model="en"),
+        },
+    ),
+    Models.Fans_heat.name: ModelEntry(
+        compute=fans_heat_compute,
+        format_results=fans_heat_results,
+        columns=1,
+        sensitivity={"t_core": fans_heat_t_core},
+        charts={
+            Charts.fans_heat.value.name: partial(fans_heat_chart),
+        },
+    ),
+    Models.PHS.name: ModelEntry(
+        compute=phs_compute,
+        format_results=phs_results,
+        columns=1,
+        sensitivity={"t_re": phs_t_re},
+        charts={
+            Charts.phs_exposure.value.name: partial(phs_exposure_chart),
+        },
+    ),
+}
+
+
+def compute(selected_model: str, scenarios: list):
+    # the scenarios are stacked into one array per input and computed in a
+    # single call, e.g. the two scenarios of the compare mode or a sweep
+    columns = {
+        model_input.id: np.array(
+            [scenario[model_input.id] for scenario in scenarios], dtype=float
+        )
+        for model_input in Models[selected_model].value.inputs
+    }
+    return MODEL_REGISTRY[selected_model].compute(columns)
+
+
+@shared_cache
+def scenario_outputs(selected_model: str, inputs: dict, output: str = None):
+    # outputs of one scenario, memoised on the model inputs only so that the
+    # results and the functionalities showing the same scenario share them.
+    # output selects one of the sensitivity outputs instead of the results
+    model = MODEL_REGISTRY[selected_model]
+    function = model.sensitivity[output] if output else model.compute
+    outputs = function(
+        {
+            model_input.id: np.array([inputs[model_input.id]], dtype=float)
+            for model_input in Models[selected_model].value.inputs
+        }
+    )
+    return {name: values[0] for name, values in outputs.items()}
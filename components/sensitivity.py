@@ -0,0 +1,160 @@
+import dash_mantine_components as dmc
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+
+from components.charts import DEFAULT_PIXEL_WIDTH, figure_to_image
+from utils.my_config_file import ElementsIDs, Models
+
+# each input is moved down and up by its step and the derivatives are the
+# central differences. pythermalcomfort rounds the PMV to two decimals, the
+# steps change it by more than the rounding
+SENSITIVITY_STEPS = {
+    ElementsIDs.t_db_input.value: 0.5,
+    ElementsIDs.t_r_input.value: 0.5,
+    ElementsIDs.t_rm_input.value: 0.5,
+    ElementsIDs.v_input.value: 0.05,
+    ElementsIDs.rh_input.value: 5,
+    ElementsIDs.met_input.value: 0.05,
+    ElementsIDs.clo_input.value: 0.05,
+    ElementsIDs.duration_input.value: 10,
+}
+SENSITIVITY_OUTPUTS = {
+    "pmv": "PMV",
+    "set": "SET",
+    "tmp_cmf": "Comfort temperature",
+    "t_re": "Rectal temperature",
+    "t_core": "Core temperature",
+}
+SENSITIVITY_COLORS = ("#7BD0F2", "#1C7ED6")
+
+
+def sensitivity(inputs: dict, selected_model: str, compute, output: str, base):
+    # output of the scenario with each input moved down and up by its step,
+    # ranked by the size of the change. The output of the scenario itself is
+    # given, the moved scenarios are computed together in one call. At the
+    # limits of an input only the side within the limits is moved
+    all_inputs = Models[selected_model].value.inputs
+    model_inputs = [
+        model_input for model_input in all_inputs if model_input.id in SENSITIVITY_STEPS
+    ]
+    values = np.array(
+        [[inputs[model_input.id]] * 2 for model_input in model_inputs], dtype=float
+    )
+    steps = np.array(
+        [SENSITIVITY_STEPS[model_input.id] for model_input in model_inputs]
+    )
+    moved = np.clip(
+        values + steps[:, None] * [-1, 1],
+        [[model_input.min] for model_input in model_inputs],
+        [[model_input.max] for model_input in model_inputs],
+    )
+
+    outputs = np.full(moved.shape, base, dtype=float)
+    changed, side = np.nonzero(moved != values)
+    if changed.size:
+        scenarios = {
+            model_input.id: np.full(changed.size, inputs[model_input.id], dtype=float)
+            for model_input in all_inputs
+        }
+        for row, (index, column) in enumerate(zip(changed, side)):
+            scenarios[model_inputs[index].id][row] = moved[index, column]
+        outputs[changed, side] = compute(scenarios)[output]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        derivatives = (outputs[:, 1] - outputs[:, 0]) / (moved[:, 1] - moved[:, 0])
+    spans = np.nan_to_num(np.abs(outputs[:, 1] - outputs[:, 0]))
+    return [
+        {
+            "name": model_inputs[index].name,
+            "unit": model_inputs[index].unit,
+            "step": steps[index],
+            "low": outputs[index, 0],
+            "high": outputs[index, 1],
+            "derivative": derivatives[index],
+        }
+        for index in np.argsort(-spans, kind="stable")
+    ]
+
+
+def tornado_chart(
+    rows: list,
+    base,
+    label: str,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    f = Figure(figsize=(6, 0.8 + 0.35 * len(rows)))
+    ax = f.subplots()
+    positions = np.arange(len(rows))[::-1]
+    for position, row in zip(positions, rows):
+        for value, color in zip((row["low"], row["high"]), SENSITIVITY_COLORS):
+            ax.barh(position, value - base, left=base, color=color, height=0.6)
+    ax.axvline(base, color="black", linewidth=0.8)
+    ax.set(
+        yticks=positions,
+        yticklabels=[f"{row['name']} ± {row['step']:g} {row['unit']}" for row in rows],
+        xlabel=label,
+    )
+    ax.legend(
+        handles=[
+            Patch(color=color, label=name)
+            for color, name in zip(
+                SENSITIVITY_COLORS, ("Input decreased", "Input increased")
+            )
+        ],
+        loc="lower center",
+        bbox_to_anchor=(0.5, 1),
+        ncol=2,
+        frameon=False,
+        fontsize="small",
+    )
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        f"Sensitivity of the {label} to the inputs",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
+    )
+
+
+def sensitivity_results(
+    inputs: dict,
+    selected_model: str,
+    compute,
+    output: str,
+    base,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    label = SENSITIVITY_OUTPUTS.get(output, output)
+    if np.isnan(base):
+        return [dmc.Center(dmc.Text(f"{label} not available for these inputs"))]
+    rows = sensitivity(inputs, selected_model, compute, output, base)
+    return [
+        *(
+            dmc.Center(
+                dmc.Text(
+                    f"{row['name']}: {row['derivative']:+.2f} {label}/{row['unit']}"
+                    if np.isfinite(row["derivative"])
+                    else f"{row['name']}: -"
+                )
+            )
+            for row in rows
+        ),
+        dmc.Center(
+            dmc.Text(
+                f"Change of the {label} for each input moved down and up by the "
+                "step shown, ranked by the size of the change",
+                size="sm",
+                c="dimmed",
+            )
+        ),
+        tornado_chart(rows, base, label, pixel_width, webp),
+    ]
@@ -0,0 +1,164 @@
+import base64
+import io
+
+import dash_mantine_components as dmc
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.tri import Triangulation
+
+from components.charts import DEFAULT_PIXEL_WIDTH, figure_to_image
+from components.model_registry import MODEL_REGISTRY
+from utils.my_config_file import Config, ElementsIDs
+from utils.shared_cache import shared_cache
+
+# columns of the uploaded file, one row per sensor, SI units: x and y in m,
+# temperatures in °C, air speed in m/s and relative humidity in %
+SENSOR_GRID_COLUMNS = ("x", "y", "tdb", "tr", "v", "rh")
+SENSOR_GRID_INPUTS = {
+    "tdb": ElementsIDs.t_db_input.value,
+    "tr": ElementsIDs.t_r_input.value,
+    "v": ElementsIDs.v_input.value,
+    "rh": ElementsIDs.rh_input.value,
+}
+SENSOR_GRID_PMV_RANGE = (-3, 3)
+SENSOR_GRID_COMFORT = 0.5
+# the sensors are only marked on the map when they do not hide it
+SENSOR_GRID_MARKERS = 500
+
+
+def parse_sensor_grid(contents: str):
+    # contents of dcc.Upload, "data:text/csv;base64,<data>"
+    _, _, encoded = contents.partition(",")
+    text = base64.b64decode(encoded).decode("utf-8-sig")
+    header, _, body = text.partition("\n")
+    columns = [name.strip().lower() for name in header.split(",")]
+    missing = [name for name in SENSOR_GRID_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    values = np.loadtxt(io.StringIO(body), delimiter=",", ndmin=2)
+    if not 3 <= len(values) <= Config.SENSOR_GRID_MAX_POINTS.value:
+        raise ValueError(
+            f"The file must contain between 3 and "
+            f"{Config.SENSOR_GRID_MAX_POINTS.value:,} sensors"
+        )
+    return {name: values[:, columns.index(name)] for name in SENSOR_GRID_COLUMNS}
+
+
+def comfortable_area(triangulation: Triangulation, comfortable):
+    # each triangle between the sensors counts for the fraction of its
+    # corners within the comfort range, weighted by its area
+    x = triangulation.x[triangulation.triangles]
+    y = triangulation.y[triangulation.triangles]
+    area = 0.5 * np.abs(
+        (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0])
+        - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+    )
+    return np.sum(area * comfortable[triangulation.triangles].mean(axis=1)) / np.sum(
+        area
+    )
+
+
+def sensor_grid_map(
+    triangulation: Triangulation,
+    pmv,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    f = Figure(figsize=(6, 5))
+    ax = f.subplots()
+    # the triangles with a sensor outside the limits of the model are not drawn
+    triangulation.set_mask(np.isnan(pmv)[triangulation.triangles].any(axis=1))
+    values = np.clip(np.nan_to_num(pmv), *SENSOR_GRID_PMV_RANGE)
+    contours = ax.tricontourf(
+        triangulation,
+        values,
+        levels=np.linspace(*SENSOR_GRID_PMV_RANGE, 25),
+        cmap="RdBu_r",
+        # the filled contours are embedded as an image in the svg, the axes
+        # and the text stay vectors
+        rasterized=True,
+    )
+    ax.tricontour(
+        triangulation,
+        values,
+        levels=[-SENSOR_GRID_COMFORT, SENSOR_GRID_COMFORT],
+        colors="black",
+        linewidths=0.8,
+        linestyles="solid",
+    )
+    if len(pmv) <= SENSOR_GRID_MARKERS:
+        ax.plot(triangulation.x, triangulation.y, "k.", markersize=2)
+    # below the map, whose height depends on the shape of the floor
+    f.colorbar(
+        contours,
+        ax=ax,
+        label="PMV",
+        ticks=np.arange(-3, 4),
+        orientation="horizontal",
+        shrink=0.8,
+    )
+    ax.set(xlabel="x [m]", ylabel="y [m]", aspect="equal")
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "PMV at the sensors",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+    )
+
+
+@shared_cache
+def sensor_grid_results(
+    selected_model: str,
+    met: float,
+    clo: float,
+    contents: str,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    try:
+        points = parse_sensor_grid(contents)
+        triangulation = Triangulation(points["x"], points["y"])
+    except (ValueError, RuntimeError, UnicodeDecodeError) as error:
+        # e.g. a missing column or all the sensors on a line
+        return [dmc.Text(f"The file could not be read: {error}", c="red")]
+
+    # all the sensors are computed in one call, with the shared met and clo
+    size = len(points["x"])
+    outputs = MODEL_REGISTRY[selected_model].compute(
+        {
+            **{input_id: points[name] for name, input_id in SENSOR_GRID_INPUTS.items()},
+            ElementsIDs.met_input.value: np.full(size, met),
+            ElementsIDs.clo_input.value: np.full(size, clo),
+        }
+    )
+    pmv, ppd = outputs["pmv"], outputs["ppd"]
+    comfortable = np.abs(pmv) <= SENSOR_GRID_COMFORT
+
+    return [
+        dmc.Center(
+            dmc.Text(
+                f"Floor area within -{SENSOR_GRID_COMFORT} ≤ PMV ≤ "
+                f"{SENSOR_GRID_COMFORT}: "
+                f"{comfortable_area(triangulation, comfortable):.0%}"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(
+                f"Sensors within the range: {np.sum(comfortable):,} of {size:,}, "
+                f"mean PPD: {np.nanmean(ppd):.1f}%"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(
+                f"PMV: {np.nanmin(pmv):.2f} to {np.nanmax(pmv):.2f}, "
+                f"{np.sum(np.isnan(pmv)):,} sensors outside the limits of the model",
+                size="sm",
+                c="dimmed",
+            )
+        ),
+        sensor_grid_map(triangulation, pmv, pixel_width, webp),
+    ]
@@ -1,107 +1,70 @@
 import dash_mantine_components as dmc
-from pythermalcomfort.models import pmv_ppd, adaptive_ashrae
-from pythermalcomfort.utilities import v_relative, clo_dynamic, mapping
 
-from utils.get_inputs import get_inputs
-from utils.my_config_file import (
-    Models,
-    UnitSystem,
-    UnitConverter,
-    ElementsIDs,
-)
+from components.charts import DEFAULT_PIXEL_WIDTH
+from components.model_registry import MODEL_REGISTRY, scenario_outputs
+from components.sensitivity import sensitivity_results
+from utils.shared_cache import shared_cache
+from utils.my_config_file import ElementsIDs, Functionalities, Models
 
 
-def display_results(inputs: dict):
+@shared_cache
+def display_results(
+    inputs: dict, pixel_width: int = DEFAULT_PIXEL_WIDTH, webp: bool = True
+):
 
     selected_model: str = inputs[ElementsIDs.MODEL_SELECTION.value]
     units: str = inputs[ElementsIDs.UNIT_TOGGLE.value]
+    model = MODEL_REGISTRY[selected_model]
 
-    results = []
-    columns: int = 2
-    if selected_model == Models.PMV_EN.name or selected_model == Models.PMV_ashrae.name:
-        columns = 3
-        standard = "ISO"
-        if selected_model == Models.PMV_ashrae.name:
-            standard = "ashrae"
+    functionality = inputs.get(ElementsIDs.functionality_selection.value)
+    # only the model inputs are part of the memo key, the outputs are reused
+    # when the scenario is shown with another functionality or chart
+    values = {
+        model_input.id: inputs[model_input.id]
+        for model_input in Models[selected_model].value.inputs
+    }
+    outputs = scenario_outputs(selected_model, values)
+    results = model.format_results(outputs, units)
 
-        r_pmv = pmv_ppd(
-            tdb=inputs[ElementsIDs.t_db_input.value],
-            tr=inputs[ElementsIDs.t_r_input.value],
-            vr=v_relative(
-                v=inputs[ElementsIDs.v_input.value],
-                met=inputs[ElementsIDs.met_input.value],
-            ),
-            rh=inputs[ElementsIDs.rh_input.value],
-            met=inputs[ElementsIDs.met_input.value],
-            clo=clo_dynamic(
-                clo=inputs[ElementsIDs.clo_input.value],
-                met=inputs[ElementsIDs.met_input.value],
-            ),
-            wme=0,
-            limit_inputs=True,
-            standard=standard,
-        )
-        results.append(dmc.Center(dmc.Text(f"PMV: {r_pmv['pmv']}")))
-        results.append(dmc.Center(dmc.Text(f"PPD: {r_pmv['ppd']}")))
-        comfort_category = mapping(
-            r_pmv["pmv"],
-            {
-                -2.5: "Cold",
-                -1.5: "Cool",
-                -0.5: "Slightly Cool",
-                0.5: "Neutral",
-                1.5: "Slightly Warm",
-                2.5: "Warm",
-                10: "Hot",
-            },
-        )
-        results.append(dmc.Center(dmc.Text(f"Sensation: {comfort_category}")))
-    elif selected_model == Models.Adaptive_ASHRAE.name:
-        columns = 1
-
-        adaptive = adaptive_ashrae(
-            tdb=inputs[ElementsIDs.t_db_input.value],
-            tr=inputs[ElementsIDs.t_r_input.value],
-            t_running_mean=inputs[ElementsIDs.t_rm_input.value],
-            v=inputs[ElementsIDs.v_input.value],
-        )
-        if units == UnitSystem.IP.value:
-            adaptive.tmp_cmf = round(
-                UnitConverter.celsius_to_fahrenheit(adaptive.tmp_cmf), 2
-            )
-            adaptive.tmp_cmf_80_low = round(
-                UnitConverter.celsius_to_fahrenheit(adaptive.tmp_cmf_80_low), 2
-            )
-            adaptive.tmp_cmf_80_up = round(
-                UnitConverter.celsius_to_fahrenheit(adaptive.tmp_cmf_80_up), 2
-            )
-            adaptive.tmp_cmf_90_low = round(
-                UnitConverter.celsius_to_fahrenheit(adaptive.tmp_cmf_90_low), 2
-            )
-            adaptive.tmp_cmf_90_up = round(
-                UnitConverter.celsius_to_fahrenheit(adaptive.tmp_cmf_90_up), 2
-            )
-        results.append(dmc.Center(dmc.Text(f"Comfort temperature: {adaptive.tmp_cmf}")))
-        results.append(
-            dmc.Center(
-                dmc.Text(
-                    f"Comfort range for 80% occupants: {adaptive.tmp_cmf_80_low} - {adaptive.tmp_cmf_80_up}"
-                )
-            )
-        )
-        results.append(
-            dmc.Center(
-                dmc.Text(
-                    f"Comfort range for 90% occupants: {adaptive.tmp_cmf_90_low} - {adaptive.tmp_cmf_90_up}"
-                )
-            )
-        )
-
-    return (
+    sections = (
         dmc.SimpleGrid(
-            cols=columns,
+            cols=model.columns,
             spacing="xs",
             verticalSpacing="xs",
             children=results,
         ),
     )
+    if functionality == Functionalities.Uncertainty.value and model.uncertainty:
+        sections += (
+            dmc.Stack(
+                model.uncertainty(inputs, pixel_width=pixel_width, webp=webp),
+                gap="xs",
+                mt="sm",
+            ),
+        )
+    if functionality == Functionalities.Sensitivity.value and model.sensitivity:
+        output = model.chart_outputs.get(
+            inputs.get(ElementsIDs.chart_selected.value), next(iter(model.sensitivity))
+        )
+        # only the moved scenarios are computed when the results include the
+        # output, e.g. the PMV but not the SET
+        if output in outputs:
+            base = outputs[output]
+        else:
+            base = scenario_outputs(selected_model, values, output)[output]
+        sections += (
+            dmc.Stack(
+                sensitivity_results(
+                    values,
+                    selected_model,
+                    model.sensitivity[output],
+                    output,
+                    base,
+                    pixel_width,
+                    webp,
+                ),
+                gap="xs",
+                mt="sm",
+            ),
+        )
+    return sections
@@ -0,0 +1,304 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from pythermalcomfort.models import pmv, set_tmp
+
+# the solvers find the roots of many equations at once, all the elements are
+# iterated in lockstep with a vectorized call of the model at each step
+
+
+def bisect(function, low, high, size: int, tolerance: float = 0.01):
+    # finds the roots of a monotonic function for all the elements at once,
+    # NaN where the root is not in [low, high]
+    low = np.full(size, low, dtype=float)
+    high = np.full(size, high, dtype=float)
+    f_low = function(low)
+    found = np.sign(f_low) != np.sign(function(high))
+    while np.max(high - low) > tolerance:
+        middle = (low + high) / 2
+        f_middle = function(middle)
+        below = np.sign(f_middle) == np.sign(f_low)
+        low = np.where(below, middle, low)
+        f_low = np.where(below, f_middle, f_low)
+        high = np.where(below, high, middle)
+    return np.where(found, (low + high) / 2, np.nan)
+
+
+def regula_falsi(
+    function, low, high, f_low, f_high, tolerance: float, max_iterations: int = 50
+):
+    # Illinois variant of the false position method for roots bracketed by
+    # [low, high]. function(x, index) is only evaluated for the elements that
+    # have not converged, index gives their position in the arrays
+    root = (low + high) / 2
+    converged = np.zeros(low.size, dtype=bool)
+    active = np.arange(low.size)
+    side = np.zeros(low.size)
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        x = (low * f_high - high * f_low) / (f_high - f_low)
+        f_x = function(x, active)
+        root[active] = x
+        same = np.sign(f_x) == np.sign(f_low)
+        # the end point kept twice in a row is moved half way to the root
+        f_high = np.where(same & (side == 1), f_high / 2, f_high)
+        f_low = np.where(~same & (side == -1), f_low / 2, f_low)
+        low, f_low = np.where(same, x, low), np.where(same, f_x, f_low)
+        high, f_high = np.where(same, high, x), np.where(same, f_high, f_x)
+        side = np.where(same, 1, -1)
+        done = np.abs(f_x) <= tolerance
+        converged[active[done]] = True
+        active, low, high, f_low, f_high, side = (
+            value[~done] for value in (active, low, high, f_low, f_high, side)
+        )
+    return root, converged
+
+
+# tolerances of scipy.optimize.brentq, which pythermalcomfort uses
+BRENTQ_XTOL = 2e-12
+BRENTQ_RTOL = 4 * np.finfo(float).eps
+BRENTQ_MAX_ITERATIONS = 100
+
+
+def brentq(
+    function, low, high, f_low, f_high, max_iterations: int = BRENTQ_MAX_ITERATIONS
+):
+    # Brent's method as in scipy.optimize.brentq, step by step, so that the
+    # same root is found when the function has several sign changes.
+    # function(x, index) is only evaluated for the elements that have not
+    # converged, the roots are NaN where [low, high] is not a bracket
+    root = np.where(f_low == 0, low, np.where(f_high == 0, high, np.nan))
+    active = np.flatnonzero(np.isnan(root) & (np.sign(f_low) != np.sign(f_high)))
+    x_pre, x_cur, f_pre, f_cur = (value[active] for value in (low, high, f_low, f_high))
+    x_blk, f_blk, s_pre, s_cur = (np.zeros(active.size) for _ in range(4))
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        # the contrapoint keeps the root bracketed
+        switched = (f_pre != 0) & (f_cur != 0) & (np.sign(f_pre) != np.sign(f_cur))
+        x_blk = np.where(switched, x_pre, x_blk)
+        f_blk = np.where(switched, f_pre, f_blk)
+        s_pre = np.where(switched, x_cur - x_pre, s_pre)
+        s_cur = np.where(switched, x_cur - x_pre, s_cur)
+        # the best estimate is the point with the smallest value
+        swap = np.abs(f_blk) < np.abs(f_cur)
+        x_pre, x_cur, x_blk = (
+            np.where(swap, x_cur, x_pre),
+            np.where(swap, x_blk, x_cur),
+            np.where(swap, x_cur, x_blk),
+        )
+        f_pre, f_cur, f_blk = (
+            np.where(swap, f_cur, f_pre),
+            np.where(swap, f_blk, f_cur),
+            np.where(swap, f_cur, f_blk),
+        )
+        delta = (BRENTQ_XTOL + BRENTQ_RTOL * np.abs(x_cur)) / 2
+        s_bis = (x_blk - x_cur) / 2
+        done = (f_cur == 0) | (np.abs(s_bis) < delta)
+        root[active[done]] = x_cur[done]
+        keep = ~done
+        active, x_pre, x_cur, x_blk, f_pre, f_cur, f_blk, s_pre, s_cur = (
+            value[keep]
+            for value in (
+                active,
+                x_pre,
+                x_cur,
+                x_blk,
+                f_pre,
+                f_cur,
+                f_blk,
+                s_pre,
+                s_cur,
+            )
+        )
+        delta, s_bis = delta[keep], s_bis[keep]
+        if active.size == 0:
+            break
+
+        # inverse quadratic extrapolation or secant step, bisection when the
+        # step is too long or the previous one too short
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+            d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+            s_try = np.where(
+                x_pre == x_blk,
+                -f_cur * (x_cur - x_pre) / (f_cur - f_pre),
+                -f_cur
+                * (f_blk * d_blk - f_pre * d_pre)
+                / (d_blk * d_pre * (f_blk - f_pre)),
+            )
+        interpolate = (np.abs(s_pre) > delta) & (np.abs(f_cur) < np.abs(f_pre))
+        short = interpolate & (
+            2 * np.abs(s_try) < np.minimum(np.abs(s_pre), 3 * np.abs(s_bis) - delta)
+        )
+        s_pre, s_cur = np.where(short, s_cur, s_bis), np.where(short, s_try, s_bis)
+
+        x_pre, f_pre = x_cur, f_cur
+        x_cur = x_cur + np.where(
+            np.abs(s_cur) > delta, s_cur, np.where(s_bis > 0, delta, -delta)
+        )
+        f_cur = function(x_cur, active)
+    # like scipy, the last estimate when the iterations are exhausted
+    root[active] = x_cur
+    return root
+
+
+# ASHRAE 55 cooling effect of an elevated air speed, the drop of the air and
+# radiant temperatures that gives the same SET in still air
+COOLING_EFFECT_RANGE = (0, 40)
+STILL_AIR_SPEED = 0.1
+COOLING_EFFECT_CACHE_SIZE = 10_000
+_cooling_effect_cache = OrderedDict()
+# the callbacks run in several threads of a worker, the order of the cache
+# is changed by every lookup
+_cooling_effect_lock = threading.Lock()
+
+
+def _solve_cooling_effect(tdb, tr, vr, rh, met, clo, wme):
+    def set_difference(ce, index):
+        return (
+            set_tmp(
+                tdb[index] - ce,
+                tr[index] - ce,
+                v=STILL_AIR_SPEED,
+                rh=rh[index],
+                met=met[index],
+                clo=clo[index],
+                wme=wme[index],
+                round=False,
+                calculate_ce=True,
+                limit_inputs=False,
+            )
+            - target[index]
+        )
+
+    target = set_tmp(
+        tdb,
+        tr,
+        v=vr,
+        rh=rh,
+        met=met,
+        clo=clo,
+        wme=wme,
+        round=False,
+        calculate_ce=True,
+        limit_inputs=False,
+    )
+    # like pythermalcomfort, the root is searched in COOLING_EFFECT_RANGE with
+    # Brent's method. The SET is not continuous for some inputs, the same steps
+    # find the same root. The cooling effect is 0 in still air, when the still
+    # air is not warmer or when the root is not in the range
+    active = np.flatnonzero(vr > STILL_AIR_SPEED)
+    low, high = (np.full(active.size, float(value)) for value in COOLING_EFFECT_RANGE)
+    root = brentq(
+        lambda x, index: set_difference(x, active[index]),
+        low,
+        high,
+        set_difference(low, active),
+        set_difference(high, active),
+        BRENTQ_MAX_ITERATIONS,
+    )
+    ce = np.zeros(tdb.size)
+    ce[active] = np.nan_to_num(root, nan=0.0)
+    return np.around(ce, 2)
+
+
+def cooling_effect(tdb, tr, vr, rh, met, clo, wme=0, cache: bool = True):
+    # arrays of scenarios, the results are cached per scenario and the
+    # scenarios not in the cache are solved together. Random samples are
+    # not seen again and are solved without the cache
+    arrays = np.broadcast_arrays(tdb, tr, vr, rh, met, clo, wme)
+    scenarios = [np.asarray(value, dtype=float).ravel() for value in arrays]
+    if not cache:
+        return _solve_cooling_effect(*scenarios).reshape(arrays[0].shape)
+    keys = list(zip(*(value.tolist() for value in scenarios)))
+    with _cooling_effect_lock:
+        missing = [
+            index for index, key in enumerate(keys) if key not in _cooling_effect_cache
+        ]
+        if missing:
+            solved = _solve_cooling_effect(*(value[missing] for value in scenarios))
+            for index, value in zip(missing, solved.tolist()):
+                _cooling_effect_cache[keys[index]] = value
+        ce = np.array([_cooling_effect_cache[key] for key in keys])
+        for key in keys:
+            _cooling_effect_cache.move_to_end(key)
+        while len(_cooling_effect_cache) > COOLING_EFFECT_CACHE_SIZE:
+            _cooling_effect_cache.popitem(last=False)
+    return ce.reshape(arrays[0].shape)
+
+
+def pmv_still_air(tdb, tr, vr, rh, met, clo, wme=0, standard: str = "iso"):
+    # PMV without the input limits, for ASHRAE the elevated air speed is
+    # replaced by its cooling effect. The ISO calculation is the same in still
+    # air and does not solve the cooling effect again one scenario at a time
+    if standard.lower() == "ashrae":
+        tdb, tr, vr, rh, met, clo, wme = (
+            np.asarray(value, dtype=float).ravel()
+            for value in np.broadcast_arrays(tdb, tr, vr, rh, met, clo, wme)
+        )
+        ce = _solve_cooling_effect(tdb, tr, vr, rh, met, clo, wme)
+        tdb, tr, vr = tdb - ce, tr - ce, np.where(ce > 0, STILL_AIR_SPEED, vr)
+    return pmv(tdb, tr, vr, rh, met, clo, wme, standard="iso", limit_inputs=False)
+
+
+# inputs of solve_pmv and the range searched for each of them
+PMV_INPUTS_RANGES = {
+    "tdb": (10, 40),
+    "tr": (10, 40),
+    "vr": (0, 2),
+    "rh": (0, 100),
+    "met": (0.8, 4),
+    "clo": (0, 2),
+}
+# pythermalcomfort rounds the PMV to two decimals
+PMV_TOLERANCE = 0.005
+
+
+def solve_pmv(
+    target,
+    solve_for,
+    standard: str = "iso",
+    bounds: tuple = None,
+    tolerance: float = PMV_TOLERANCE,
+    **inputs,
+):
+    # value of the input solve_for that gives PMV = target, e.g.
+    # solve_pmv(0.5, "tdb", tr=tr, vr=vr, rh=rh, met=met, clo=clo). The target
+    # and the other inputs are broadcast together, solve_for can also be a
+    # tuple of inputs set to the same value, e.g. ("tdb", "tr") for the
+    # operative temperature. Returns the roots and whether they converged,
+    # the roots are NaN where the target is not reached within the bounds
+    names = (solve_for,) if isinstance(solve_for, str) else tuple(solve_for)
+    low, high = bounds or PMV_INPUTS_RANGES[names[0]]
+    inputs = {"wme": 0, **inputs}
+    arrays = np.broadcast_arrays(target, *inputs.values())
+    shape = arrays[0].shape
+    target, *values = (np.asarray(value, dtype=float).ravel() for value in arrays)
+    inputs = dict(zip(inputs, values))
+
+    def difference(x, index):
+        values = {name: value[index] for name, value in inputs.items()}
+        values.update({name: x for name in names})
+        return pmv_still_air(**values, standard=standard) - target[index]
+
+    every = np.arange(target.size)
+    low, high = np.full(target.size, low, float), np.full(target.size, high, float)
+    f_low, f_high = difference(low, every), difference(high, every)
+    # the PMV is monotonic in each input, the root is bracketed when the
+    # difference changes sign between the bounds
+    found = np.flatnonzero(np.sign(f_low) != np.sign(f_high))
+    root = np.full(target.size, np.nan)
+    converged = np.zeros(target.size, dtype=bool)
+    root[found], converged[found] = regula_falsi(
+        lambda x, index: difference(x, found[index]),
+        low[found],
+        high[found],
+        f_low[found],
+        f_high[found],
+        tolerance,
+    )
+    root = np.where(converged, root, np.nan)
+    return root.reshape(shape), converged.reshape(shape)
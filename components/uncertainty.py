@@ -0,0 +1,159 @@
+import dash_mantine_components as dmc
+import numpy as np
+from matplotlib.figure import Figure
+from pythermalcomfort.models import pmv_ppd
+from pythermalcomfort.utilities import v_relative, clo_dynamic
+
+from components.charts import DEFAULT_PIXEL_WIDTH, figure_to_image
+from components.solvers import cooling_effect, STILL_AIR_SPEED
+from utils.my_config_file import Config, ElementsIDs, Models
+
+# the inputs are sampled from normal distributions around their values, with
+# these coefficients of variation, and clipped to the limits of the model
+UNCERTAINTY_INPUTS = {
+    ElementsIDs.met_input.value: 0.1,
+    ElementsIDs.clo_input.value: 0.2,
+    ElementsIDs.v_input.value: 0.3,
+    ElementsIDs.rh_input.value: 0.1,
+}
+UNCERTAINTY_PERCENTILES = (5, 50, 95)
+# same seed for every run, so that the same inputs give the same results
+UNCERTAINTY_SEED = 0
+
+
+def input_samples(
+    inputs: dict,
+    selected_model: str,
+    samples: int = Config.MONTE_CARLO_SAMPLES.value,
+    chunk_size: int = Config.MONTE_CARLO_CHUNK_SIZE.value,
+):
+    # the samples are generated in chunks, so that the memory used does not
+    # grow with the number of samples beyond the results
+    rng = np.random.default_rng(UNCERTAINTY_SEED)
+    limits = {
+        model_input.id: (model_input.min, model_input.max)
+        for model_input in Models[selected_model].value.inputs
+    }
+    for start in range(0, samples, chunk_size):
+        size = min(chunk_size, samples - start)
+        yield {
+            input_id: np.clip(
+                rng.normal(inputs[input_id], variation * abs(inputs[input_id]), size),
+                *limits[input_id],
+            )
+            for input_id, variation in UNCERTAINTY_INPUTS.items()
+        }
+
+
+def pmv_samples(
+    inputs: dict,
+    selected_model: str,
+    standard: str,
+    samples: int = Config.MONTE_CARLO_SAMPLES.value,
+    chunk_size: int = Config.MONTE_CARLO_CHUNK_SIZE.value,
+):
+    tdb = inputs[ElementsIDs.t_db_input.value]
+    tr = inputs[ElementsIDs.t_r_input.value]
+    pmv = np.empty(samples)
+    ppd = np.empty(samples)
+    start = 0
+    for sampled in input_samples(inputs, selected_model, samples, chunk_size):
+        size = len(sampled[ElementsIDs.met_input.value])
+        met = sampled[ElementsIDs.met_input.value]
+        vr = v_relative(v=sampled[ElementsIDs.v_input.value], met=met)
+        rh = sampled[ElementsIDs.rh_input.value]
+        clo = clo_dynamic(clo=sampled[ElementsIDs.clo_input.value], met=met)
+        # the ASHRAE cooling effect depends on all the sampled inputs, it is
+        # solved for all the samples of the chunk at once
+        ce = (
+            cooling_effect(tdb, tr, vr, rh, met, clo, cache=False)
+            if standard == "ashrae"
+            else 0
+        )
+        results = pmv_ppd(
+            tdb=tdb - ce,
+            tr=tr - ce,
+            vr=np.where(ce > 0, STILL_AIR_SPEED, vr),
+            rh=rh,
+            met=met,
+            clo=clo,
+            wme=0,
+            limit_inputs=False,
+            standard="iso",
+        )
+        pmv[start : start + size] = results["pmv"]
+        ppd[start : start + size] = results["ppd"]
+        start += size
+    return pmv, ppd
+
+
+def uncertainty_chart(
+    pmv, ppd, pixel_width: int = DEFAULT_PIXEL_WIDTH, webp: bool = True
+):
+    f = Figure(figsize=(6, 2.5))
+    axs = f.subplots(1, 2)
+    for ax, values, label in ((axs[0], pmv, "PMV"), (axs[1], ppd, "PPD [%]")):
+        ax.hist(values, bins=50, color="#7BD0F2", edgecolor="#1C7ED6", linewidth=0.3)
+        for percentile in np.percentile(values, UNCERTAINTY_PERCENTILES):
+            ax.axvline(percentile, color="#1C7ED6", linestyle="--", linewidth=1)
+        ax.set(xlabel=label, yticks=[])
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+        ax.spines["left"].set_visible(False)
+    f.tight_layout()
+
+    return figure_to_image(
+        f,
+        "PMV and PPD distributions",
+        pixel_width,
+        webp,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0,
+    )
+
+
+def pmv_uncertainty(
+    inputs: dict,
+    selected_model: str,
+    standard: str,
+    pixel_width: int = DEFAULT_PIXEL_WIDTH,
+    webp: bool = True,
+):
+    pmv, ppd = pmv_samples(inputs, selected_model, standard)
+    pmv_percentiles = np.percentile(pmv, UNCERTAINTY_PERCENTILES)
+    ppd_percentiles = np.percentile(ppd, UNCERTAINTY_PERCENTILES)
+    comfortable = np.mean(np.abs(pmv) <= 0.5) * 100
+    names = {
+        model_input.id: model_input.name
+        for model_input in Models[selected_model].value.inputs
+    }
+    return [
+        dmc.Center(
+            dmc.Text(
+                f"PMV: {pmv_percentiles[1]:.2f} "
+                f"({pmv_percentiles[0]:.2f} to {pmv_percentiles[2]:.2f})"
+            )
+        ),
+        dmc.Center(
+            dmc.Text(
+                f"PPD: {ppd_percentiles[1]:.1f} "
+                f"({ppd_percentiles[0]:.1f} to {ppd_percentiles[2]:.1f})"
+            )
+        ),
+        dmc.Center(dmc.Text(f"-0.5 ≤ PMV ≤ 0.5: {comfortable:.0f}% of the samples")),
+        dmc.Center(
+            dmc.Text(
+                f"Median and {UNCERTAINTY_PERCENTILES[0]}th to "
+                f"{UNCERTAINTY_PERCENTILES[2]}th percentiles of {len(pmv):,} "
+                "samples, standard deviations: "
+                + ", ".join(
+                    f"{names[input_id]} {variation:.0%}"
+                    for input_id, variation in UNCERTAINTY_INPUTS.items()
+                ),
+                size="sm",
+                c="dimmed",
+            )
+        ),
+        uncertainty_chart(pmv, ppd, pixel_width, webp),
+    ]
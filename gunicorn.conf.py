@@ -0,0 +1,46 @@
+import math
+import os
+import shutil
+import tempfile
+
+
+def available_cpus():
+    # Cloud Run and Docker limit the CPU with a cgroup quota, which is not
+    # reflected by os.cpu_count()
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT_APP', 8080)}"
+# the callbacks are CPU bound (numba and matplotlib), hence one process per core
+# and a few threads to serve the quick callbacks while a chart is being drawn
+workers = int(os.environ.get("WEB_CONCURRENCY", available_cpus()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+worker_class = "gthread"
+# wsgi.py is imported, and the models warmed up, once in the master process,
+# the workers share the compiled code with copy-on-write
+preload_app = True
+timeout = 120
+accesslog = "-"
+
+# each worker writes its metrics in this folder and /metrics aggregates them.
+# It is set before the app, and prometheus_client, are imported and emptied
+# of the files of the previous run before the workers are forked
+METRICS_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "comfort-metrics"),
+)
+shutil.rmtree(METRICS_DIR, ignore_errors=True)
+os.makedirs(METRICS_DIR)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
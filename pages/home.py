@@ -1,31 +1,40 @@
 import dash
 import dash_mantine_components as dmc
-from dash import html, callback, Output, Input, no_update, State, ctx, dcc
-
-from components.charts import (
-    t_rh_pmv,
-    chart_selector,
-    SET_outputs_chart,
-    pmot_ot_adaptive_ashrae,
+from dash import (
+    html,
+    callback,
+    clientside_callback,
+    Output,
+    Input,
+    no_update,
+    State,
+    dcc,
 )
+
+from components.charts import chart_resolution, chart_selector
+from components.model_registry import MODEL_REGISTRY
 from components.dropdowns import (
     model_selection,
 )
 from components.functionality_selection import functionality_selection
 from components.input_environmental_personal import input_environmental_personal
 from components.my_card import my_card
+from components.sensor_grid import sensor_grid_results
 from components.show_results import display_results
 from utils.get_inputs import get_inputs
+from utils.profiler import profile_callback
 from utils.my_config_file import (
     URLS,
     ElementsIDs,
     Dimensions,
     UnitSystem,
     Models,
-    Charts,
     ChartsInfo,
     MyStores,
+    HumiditySelection,
+    Functionalities,
 )
+from utils.website_text import TextHome
 
 from urllib.parse import parse_qs, urlencode
 
@@ -62,6 +71,35 @@ layout = dmc.Stack(
                             html.Div(
                                 id=ElementsIDs.RESULTS_SECTION.value,
                             ),
+                            # kept in the layout so that the uploaded file is
+                            # not lost when the inputs change
+                            html.Div(
+                                id=ElementsIDs.SENSOR_GRID_SECTION.value,
+                                style={"display": "none"},
+                                children=dmc.Stack(
+                                    [
+                                        dcc.Upload(
+                                            dmc.Text(
+                                                TextHome.sensor_grid_upload.value,
+                                                size="sm",
+                                                ta="center",
+                                                p="md",
+                                            ),
+                                            id=ElementsIDs.SENSOR_GRID_UPLOAD.value,
+                                            accept=".csv",
+                                            style={
+                                                "border": "1px dashed #adb5bd",
+                                                "borderRadius": 8,
+                                                "cursor": "pointer",
+                                            },
+                                        ),
+                                        html.Div(
+                                            id=ElementsIDs.SENSOR_GRID_RESULTS.value
+                                        ),
+                                    ],
+                                    gap="xs",
+                                ),
+                            ),
                             html.Div(
                                 id=ElementsIDs.charts_dropdown.value,
                                 children=html.Div(id=ElementsIDs.chart_selected.value),
@@ -69,6 +107,7 @@ layout = dmc.Stack(
                             html.Div(
                                 id=ElementsIDs.CHART_CONTAINER.value,
                             ),
+                            dcc.Store(id=MyStores.chart_display.value),
                             dmc.Text(id=ElementsIDs.note_model.value),
                             dcc.Location(id=ElementsIDs.URL.value, refresh=False),
                         ],
@@ -86,42 +125,66 @@ layout = dmc.Stack(
     Output(MyStores.input_data.value, "data"),
     Output(ElementsIDs.URL.value, "search", allow_duplicate=True),
     Input(ElementsIDs.inputs_form.value, "n_clicks"),
-    Input(ElementsIDs.inputs_form.value, "children"),
+    Input(ElementsIDs.t_db_input.value, "value"),
+    Input(ElementsIDs.t_r_input.value, "value"),
+    Input(ElementsIDs.t_rm_input.value, "value"),
+    Input(ElementsIDs.v_input.value, "value"),
+    Input(ElementsIDs.rh_input.value, "value"),
     Input(ElementsIDs.clo_input.value, "value"),
     Input(ElementsIDs.met_input.value, "value"),
+    Input(ElementsIDs.duration_input.value, "value"),
     Input(ElementsIDs.UNIT_TOGGLE.value, "checked"),
     Input(ElementsIDs.chart_selected.value, "value"),
     Input(ElementsIDs.functionality_selection.value, "value"),
+    Input(ElementsIDs.HUMIDITY_SELECTION.value, "value"),
+    Input(ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value, "value"),
     State(ElementsIDs.MODEL_SELECTION.value, "value"),
     prevent_initial_call=True,
 )
 # save the inputs in the store, and update the URL
+# only the field values are sent to the server, not the serialized form children
 def update_store_inputs(
     form_clicks: int,
-    form_content: dict,
-    clo_value: float,
-    met_value: float,
+    t_db_value: float,
+    t_r_value: float,
+    t_rm_value: float,
+    v_value: float,
+    rh_value: float,
+    clo_value: str,
+    met_value: str,
+    duration_value: float,
     units_selection: str,
     chart_selected: str,
     functionality_selection: str,
+    humidity_selection: str,
+    speed_selection: str,
     selected_model: str,
 ):
     if form_clicks is None:
         return no_update, no_update
     units = UnitSystem.IP.value if units_selection else UnitSystem.SI.value
-    inputs = get_inputs(selected_model, form_content, units)
-
-    if ctx.triggered:
-        triggered_id = ctx.triggered[0]["prop_id"].split(".")[0]
-        if triggered_id == ElementsIDs.clo_input.value:
-            inputs[ElementsIDs.clo_input.value] = float(clo_value)
-        if triggered_id == ElementsIDs.met_input.value:
-            inputs[ElementsIDs.met_input.value] = float(met_value)
+    form_values = {
+        ElementsIDs.t_db_input.value: t_db_value,
+        ElementsIDs.t_r_input.value: t_r_value,
+        ElementsIDs.t_rm_input.value: t_rm_value,
+        ElementsIDs.v_input.value: v_value,
+        ElementsIDs.rh_input.value: rh_value,
+        ElementsIDs.clo_input.value: clo_value,
+        ElementsIDs.met_input.value: met_value,
+        ElementsIDs.duration_input.value: duration_value,
+        ElementsIDs.HUMIDITY_SELECTION.value: humidity_selection,
+        ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value: speed_selection,
+    }
+    inputs = get_inputs(selected_model, form_values, units)
 
     inputs[ElementsIDs.UNIT_TOGGLE.value] = units
     inputs[ElementsIDs.MODEL_SELECTION.value] = selected_model
     inputs[ElementsIDs.chart_selected.value] = chart_selected
     inputs[ElementsIDs.functionality_selection.value] = functionality_selection
+    if humidity_selection not in (None, HumiditySelection.relative_humidity.value):
+        inputs[ElementsIDs.HUMIDITY_SELECTION.value] = humidity_selection
+    if speed_selection is not None:
+        inputs[ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value] = speed_selection
 
     # encode the inputs to be used in the URL
     url_search = f"?{urlencode(inputs)}"
@@ -191,22 +254,48 @@ def update_note_model(selected_model):
     Output(ElementsIDs.charts_dropdown.value, "children"),
     Input(ElementsIDs.MODEL_SELECTION.value, "value"),
 )
-def update_note_model(selected_model):
+def update_chart_dropdown(selected_model):
     if selected_model is None:
         return no_update
     return chart_selector(selected_model=selected_model)
 
 
+# measures the chart container in the browser before the chart is requested,
+# so that the server renders the image at the resolution of the screen
+clientside_callback(
+    f"""
+    function(inputs) {{
+        const container = document.getElementById("{ElementsIDs.CHART_CONTAINER.value}");
+        const canvas = document.createElement("canvas");
+        canvas.width = canvas.height = 1;
+        return {{
+            width: container ? container.clientWidth : window.innerWidth,
+            dpr: window.devicePixelRatio || 1,
+            webp: canvas.toDataURL("image/webp").startsWith("data:image/webp"),
+        }};
+    }}
+    """,
+    Output(MyStores.chart_display.value, "data"),
+    Input(MyStores.input_data.value, "data"),
+    prevent_initial_call=True,
+)
+
+
 @callback(
     Output(ElementsIDs.CHART_CONTAINER.value, "children"),
-    Input(MyStores.input_data.value, "data"),
+    Input(MyStores.chart_display.value, "data"),
+    State(MyStores.input_data.value, "data"),
 )
+@profile_callback
 def update_chart(
+    display: dict,
     inputs: dict,
 ):
     selected_model: str = inputs[ElementsIDs.MODEL_SELECTION.value]
     units: str = inputs[ElementsIDs.UNIT_TOGGLE.value]
     chart_selected = inputs[ElementsIDs.chart_selected.value]
+    pixel_width, webp = chart_resolution(display)
+    resolution = {"pixel_width": pixel_width, "webp": webp}
 
     image = html.Div(
         [
@@ -217,16 +306,9 @@ def update_chart(
         ]
     )
 
-    if chart_selected == Charts.t_rh.value.name:
-        if selected_model == Models.PMV_EN.name:
-            image = t_rh_pmv(inputs=inputs, model="iso")
-        elif selected_model == Models.PMV_ashrae.name:
-            image = t_rh_pmv(inputs=inputs, model="ashrae")
-    if chart_selected == Charts.set_outputs.value.name:
-        image = SET_outputs_chart(inputs=inputs)
-    if chart_selected == Charts.pmot_ot.value.name:
-        if selected_model == Models.Adaptive_ASHRAE.name:
-            image = pmot_ot_adaptive_ashrae(inputs=inputs, model="ashrae")
+    draw_chart = MODEL_REGISTRY[selected_model].charts.get(chart_selected)
+    if draw_chart is not None:
+        image = draw_chart(inputs=inputs, **resolution)
 
     note = ""
     chart: ChartsInfo
@@ -247,9 +329,45 @@ def update_chart(
     )
 
 
+# the store of the chart display is updated with each input, the charts of the
+# functionalities are drawn for the same screen as the model chart
 @callback(
     Output(ElementsIDs.RESULTS_SECTION.value, "children"),
-    Input(MyStores.input_data.value, "data"),
+    Input(MyStores.chart_display.value, "data"),
+    State(MyStores.input_data.value, "data"),
 )
-def update_outputs(inputs: dict):
-    return display_results(inputs)
+@profile_callback
+def update_outputs(display: dict, inputs: dict):
+    pixel_width, webp = chart_resolution(display)
+    return display_results(inputs, pixel_width, webp)
+
+
+@callback(
+    Output(ElementsIDs.SENSOR_GRID_SECTION.value, "style"),
+    Output(ElementsIDs.SENSOR_GRID_RESULTS.value, "children"),
+    Input(MyStores.chart_display.value, "data"),
+    Input(ElementsIDs.SENSOR_GRID_UPLOAD.value, "contents"),
+    State(MyStores.input_data.value, "data"),
+)
+@profile_callback
+def update_sensor_grid(display: dict, contents: str, inputs: dict):
+    if inputs is None:
+        return no_update, no_update
+    selected_model: str = inputs[ElementsIDs.MODEL_SELECTION.value]
+    if (
+        inputs.get(ElementsIDs.functionality_selection.value)
+        != Functionalities.SensorGrid.value
+        or not MODEL_REGISTRY[selected_model].sensor_grid
+    ):
+        return {"display": "none"}, None
+    if contents is None:
+        return {}, None
+    pixel_width, webp = chart_resolution(display)
+    return {}, sensor_grid_results(
+        selected_model,
+        inputs[ElementsIDs.met_input.value],
+        inputs[ElementsIDs.clo_input.value],
+        contents,
+        pixel_width,
+        webp,
+    )
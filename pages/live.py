@@ -0,0 +1,111 @@
+import dash
+import dash_mantine_components as dmc
+import plotly.graph_objects as go
+from dash import Input, Output, clientside_callback, dcc
+
+from utils.my_config_file import Config, ElementsIDs, URLS
+from utils.streaming import STREAM_BUSY_RETRY_SECONDS
+
+dash.register_page(__name__, path=URLS.LIVE.value)
+
+
+def live_figure():
+    # one trace per sensor is added by the browser when its first readings arrive
+    figure = go.Figure()
+    figure.add_hrect(y0=-0.5, y1=0.5, fillcolor="#7BD0F2", opacity=0.3, line_width=0)
+    figure.update_layout(
+        template="plotly_white",
+        margin={"l": 40, "r": 10, "t": 10, "b": 40},
+        yaxis={"title": "PMV", "range": [-3, 3]},
+        xaxis={"type": "date"},
+        legend={"orientation": "h"},
+        uirevision="live",
+    )
+    return figure
+
+
+layout = dmc.Stack(
+    [
+        dmc.Text(
+            "PMV (ASHRAE 55) of the live sensors, updated as the readings are "
+            f"received at {URLS.STREAM_READINGS.value}. The shaded band is "
+            "-0.5 ≤ PMV ≤ 0.5, the PPD and the adaptive acceptability are shown "
+            "on hover.",
+            size="sm",
+        ),
+        dcc.Graph(
+            id=ElementsIDs.LIVE_CHART.value,
+            figure=live_figure(),
+            config={"displaylogo": False},
+        ),
+        dcc.Store(id=ElementsIDs.LIVE_STREAM.value),
+    ]
+)
+
+# the browser subscribes to the server-sent events and extends the traces
+# with the new readings only, the figure is not sent again by the server
+clientside_callback(
+    f"""
+    function(graphId) {{
+        if (window.comfortStream) {{
+            window.comfortStream.close();
+            clearTimeout(window.comfortStreamRetry);
+        }}
+        const traces = {{}};
+        const status = {{1: "acceptable", 0: "not acceptable"}};
+        let since = 0;
+        const connect = () => {{
+            const source = new EventSource("{URLS.STREAM_EVENTS.value}?since=" + since);
+            source.onmessage = (event) => {{
+                const container = document.getElementById(graphId);
+                const graph = container && container.querySelector(".js-plotly-plot");
+                if (!container) {{
+                    // the page has been left
+                    source.close();
+                    return;
+                }}
+                if (!graph || !window.Plotly) {{
+                    return;
+                }}
+                since = event.lastEventId || since;
+                const delta = JSON.parse(event.data);
+                for (const [sensor, values] of Object.entries(delta)) {{
+                    const x = values.time.map((time) => new Date(time * 1000));
+                    const text = values.ppd.map(
+                        (ppd, i) => `PPD: ${{ppd}}%<br>Adaptive: ${{status[values.adaptive[i]] || "-"}}`
+                    );
+                    if (!(sensor in traces)) {{
+                        traces[sensor] = graph.data.length;
+                        window.Plotly.addTraces(graph, {{
+                            x: x, y: values.pmv, text: text, name: sensor,
+                            mode: "lines", hovertemplate: "PMV: %{{y}}<br>%{{text}}",
+                        }});
+                    }} else {{
+                        window.Plotly.extendTraces(
+                            graph,
+                            {{x: [x], y: [values.pmv], text: [text]}},
+                            [traces[sensor]],
+                            {Config.STREAM_BUFFER_SIZE.value},
+                        );
+                    }}
+                }}
+            }};
+            // the browser only reconnects by itself after the server closed
+            // the stream, not when it was refused because of too many streams
+            source.onerror = () => {{
+                if (source.readyState === EventSource.CLOSED && document.getElementById(graphId)) {{
+                    window.comfortStreamRetry = setTimeout(
+                        connect, {STREAM_BUSY_RETRY_SECONDS * 1000}
+                    );
+                }}
+            }};
+            window.comfortStream = source;
+        }};
+        connect();
+        return "{URLS.STREAM_EVENTS.value}";
+    }}
+    """,
+    Output(ElementsIDs.LIVE_STREAM.value, "data"),
+    Input(ElementsIDs.LIVE_CHART.value, "id"),
+    prevent_initial_call=False,
+)
@@ -0,0 +1,218 @@
+import json
+import os
+import platform
+import timeit
+import warnings
+from functools import partial
+
+import numpy as np
+import pytest
+from pythermalcomfort.models import pmv
+from scipy import optimize
+
+from components.input_environmental_personal import input_environmental_personal
+from components.model_registry import MODEL_REGISTRY, compute
+from components.show_results import display_results
+from components.solvers import solve_pmv
+from utils.get_inputs import get_inputs
+from utils.my_config_file import (
+    ElementsIDs,
+    Functionalities,
+    Models,
+    UnitSystem,
+)
+
+# Run with: python -m pytest tests/test_benchmarks.py
+# The first run records the timings in the baseline file, the next runs fail if
+# a case is slower than the baseline by more than BENCHMARK_THRESHOLD (0.5 = 50%).
+# Set BENCHMARK_UPDATE=1 to overwrite the baseline with the current timings.
+BASELINE_FILE = os.environ.get(
+    "BENCHMARK_BASELINE",
+    os.path.join(os.path.dirname(__file__), "benchmark_baseline.json"),
+)
+THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", 0.5))
+UPDATE_BASELINE = os.environ.get("BENCHMARK_UPDATE", "0") == "1"
+ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", 5))
+# a slow case is measured again before failing, to rule out noise from the machine
+RETRIES = 2
+
+UNITS = [UnitSystem.SI.value, UnitSystem.IP.value]
+
+# number of scenarios computed at once by the batch case
+BATCH_SIZE = 1_000
+# number of air temperatures solved by the PMV solver case, each one is also
+# solved with brentq for the comparison
+SOLVER_SIZE = 100
+
+# chart functions called by update_chart for each model, __wrapped__ bypasses
+# the shared result cache so that the computation itself is measured
+CHARTS = {
+    model: {
+        name: partial(chart.func.__wrapped__, *chart.args, **chart.keywords)
+        for name, chart in entry.charts.items()
+    }
+    for model, entry in MODEL_REGISTRY.items()
+}
+
+
+def form_values(selected_model: str):
+    return {
+        model_input.id: model_input.value
+        for model_input in Models[selected_model].value.inputs
+    }
+
+
+def store_inputs(selected_model: str, units: str):
+    # same sequence as in the app, the input section is rendered first
+    input_environmental_personal(selected_model, units)
+    inputs = get_inputs(selected_model, form_values(selected_model), units)
+    inputs[ElementsIDs.UNIT_TOGGLE.value] = units
+    inputs[ElementsIDs.MODEL_SELECTION.value] = selected_model
+    return inputs
+
+
+def cases():
+    for model in Models:
+        for units in UNITS:
+            yield "get_inputs", model.name, units
+            yield "input_environmental_personal", model.name, units
+            yield "display_results", model.name, units
+            yield "batch_compute", model.name, units
+            if MODEL_REGISTRY[model.name].uncertainty is not None:
+                yield "uncertainty", model.name, units
+            if MODEL_REGISTRY[model.name].sensitivity:
+                yield "sensitivity", model.name, units
+            for chart in CHARTS[model.name]:
+                yield chart, model.name, units
+
+
+def case_function(name: str, selected_model: str, units: str):
+    inputs = store_inputs(selected_model, units)
+    if name == "get_inputs":
+        values = form_values(selected_model)
+        return lambda: get_inputs(selected_model, values, units)
+    if name == "input_environmental_personal":
+        return lambda: input_environmental_personal(selected_model, units)
+    if name == "display_results":
+        return lambda: display_results.__wrapped__(inputs)
+    if name == "uncertainty":
+        return lambda: MODEL_REGISTRY[selected_model].uncertainty(inputs)
+    if name == "sensitivity":
+        inputs[ElementsIDs.functionality_selection.value] = (
+            Functionalities.Sensitivity.value
+        )
+        return lambda: display_results.__wrapped__(inputs)
+    if name == "batch_compute":
+        scenarios = [inputs] * BATCH_SIZE
+        return lambda: compute(selected_model, scenarios)
+    chart = CHARTS[selected_model][name]
+    return lambda: chart(inputs)
+
+
+def measure(func):
+    # the first call compiles the numba functions used by pythermalcomfort
+    func()
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=ROUNDS, number=number)) / number
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    data = {"cases": {}}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            data = json.load(f)
+    results = {}
+    yield data["cases"], results
+
+    if UPDATE_BASELINE:
+        data["cases"].update(results)
+    else:
+        for case_id, value in results.items():
+            data["cases"].setdefault(case_id, value)
+    data["machine"] = f"{platform.python_version()} {platform.platform()}"
+    with open(BASELINE_FILE, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def check_baseline(baseline, case_id: str, func):
+    reference, results = baseline
+    elapsed = measure(func)
+    if not UPDATE_BASELINE and case_id in reference:
+        limit = reference[case_id] * (1 + THRESHOLD)
+        for _ in range(RETRIES):
+            if elapsed <= limit:
+                break
+            elapsed = min(elapsed, measure(func))
+    results[case_id] = elapsed
+
+    if UPDATE_BASELINE or case_id not in reference:
+        return elapsed
+    assert elapsed <= limit, (
+        f"{case_id} took {elapsed * 1000:.2f} ms, "
+        f"baseline {reference[case_id] * 1000:.2f} ms (+{THRESHOLD:.0%} allowed)"
+    )
+    return elapsed
+
+
+@pytest.mark.parametrize(
+    "name, selected_model, units",
+    list(cases()),
+    ids=["-".join(case) for case in cases()],
+)
+def test_benchmark(baseline, name, selected_model, units):
+    case_id = f"{name}-{selected_model}-{units}"
+    func = case_function(name, selected_model, units)
+    check_baseline(baseline, case_id, func)
+
+
+@pytest.mark.parametrize("standard", ["iso", "ashrae"])
+def test_solve_pmv(baseline, standard):
+    # air temperatures giving PMV = target, solved together and with one
+    # brentq call each
+    rng = np.random.default_rng(0)
+    target = rng.uniform(-1, 1, SOLVER_SIZE)
+    inputs = {
+        "tr": rng.uniform(18, 30, SOLVER_SIZE),
+        "vr": rng.uniform(0.1, 0.8, SOLVER_SIZE),
+        "rh": rng.uniform(20, 80, SOLVER_SIZE),
+        "met": rng.uniform(1, 1.6, SOLVER_SIZE),
+        "clo": rng.uniform(0.4, 1, SOLVER_SIZE),
+    }
+
+    def brentq():
+        return [
+            optimize.brentq(
+                lambda x: pmv(
+                    x,
+                    **{name: value[index] for name, value in inputs.items()},
+                    standard=standard,
+                    limit_inputs=False,
+                )
+                - target[index],
+                10,
+                40,
+            )
+            for index in range(SOLVER_SIZE)
+        ]
+
+    def batched():
+        return solve_pmv(target, "tdb", standard=standard, **inputs)
+
+    tdb, converged = batched()
+    with warnings.catch_warnings(record=True):
+        expected = np.array(brentq())
+        brentq_elapsed = measure(brentq)
+        values = pmv(tdb, **inputs, standard=standard, limit_inputs=False)
+    assert converged.all()
+    # pythermalcomfort rounds the PMV to two decimals, both solvers stop
+    # anywhere the rounded PMV equals the target
+    np.testing.assert_allclose(tdb, expected, atol=0.1)
+    np.testing.assert_allclose(values, target, atol=0.01)
+
+    elapsed = check_baseline(baseline, f"solve_pmv-{standard}", batched)
+    assert elapsed < brentq_elapsed, (
+        f"solve_pmv took {elapsed * 1000:.2f} ms, "
+        f"brentq {brentq_elapsed * 1000:.2f} ms"
+    )
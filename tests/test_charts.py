@@ -0,0 +1,50 @@
+import warnings
+
+import numpy as np
+import pytest
+from pythermalcomfort.models import use_fans_heatwaves
+
+from components.charts import (
+    DEFAULT_PIXEL_WIDTH,
+    MAX_PIXEL_WIDTH,
+    chart_resolution,
+    fans_heat,
+)
+
+
+@pytest.mark.parametrize("limit_inputs", [True, False])
+def test_fans_heat(limit_inputs):
+    # random scenarios, some of them outside the limits of the model
+    rng = np.random.default_rng(0)
+    scenarios = [
+        rng.uniform(15, 55, 200),
+        rng.uniform(15, 55, 200),
+        rng.uniform(0, 5, 200),
+        rng.uniform(0, 100, 200),
+        rng.uniform(0.6, 2.2, 200),
+        rng.uniform(0, 1.2, 200),
+    ]
+    results = fans_heat(*scenarios, limit_inputs=limit_inputs)
+    with warnings.catch_warnings(record=True):
+        expected = use_fans_heatwaves(
+            *scenarios, round=False, limit_inputs=limit_inputs
+        )
+    for name, values in results.items():
+        np.testing.assert_array_equal(values, expected[name])
+
+
+@pytest.mark.parametrize(
+    "display, expected",
+    [
+        (None, (DEFAULT_PIXEL_WIDTH, True)),
+        ({"width": 390, "dpr": 3, "webp": False}, (1200, False)),
+        ({"width": "1024", "dpr": "1.5"}, (1600, True)),
+        ({"width": "wide", "dpr": 2}, (DEFAULT_PIXEL_WIDTH, True)),
+        ({"width": [800], "dpr": None}, (DEFAULT_PIXEL_WIDTH, True)),
+        ({"width": "nan"}, (DEFAULT_PIXEL_WIDTH, True)),
+        ({"width": 1e9, "dpr": 4}, (MAX_PIXEL_WIDTH, True)),
+    ],
+    ids=["unknown", "phone", "strings", "text", "list", "nan", "huge"],
+)
+def test_chart_resolution(display, expected):
+    assert chart_resolution(display) == expected
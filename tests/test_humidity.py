@@ -0,0 +1,71 @@
+import numpy as np
+import psychrolib
+import pytest
+
+from utils.humidity import (
+    P_ATMOSPHERIC,
+    PA_PER_INHG,
+    from_relative_humidity,
+    to_relative_humidity,
+)
+from utils.my_config_file import HumiditySelection, UnitSystem
+
+psychrolib.SetUnitSystem(psychrolib.SI)
+
+TDB = np.array([12.0, 18.5, 25.0, 31.0, 38.0])
+RH = np.array([5.0, 30.0, 50.0, 75.0, 100.0])
+
+
+def reference(humidity: HumiditySelection, tdb: float, rh: float):
+    # psychrolib, one value at a time, in °C, g/kg and kPa
+    if humidity == HumiditySelection.dew_point:
+        return psychrolib.GetTDewPointFromRelHum(tdb, rh / 100)
+    if humidity == HumiditySelection.wet_bulb:
+        return psychrolib.GetTWetBulbFromRelHum(tdb, rh / 100, P_ATMOSPHERIC)
+    if humidity == HumiditySelection.humidity_ratio:
+        return 1000 * psychrolib.GetHumRatioFromRelHum(tdb, rh / 100, P_ATMOSPHERIC)
+    return psychrolib.GetVapPresFromRelHum(tdb, rh / 100) / 1000
+
+
+def to_ip(value, humidity: HumiditySelection):
+    if humidity == HumiditySelection.vapor_pressure:
+        return value * 1000 / PA_PER_INHG
+    if humidity == HumiditySelection.humidity_ratio:
+        return value
+    return value * 9 / 5 + 32
+
+
+# the dew point is interpolated in a table of the saturation pressure
+TOLERANCES = {
+    HumiditySelection.dew_point: 0.002,
+    HumiditySelection.wet_bulb: 0.001,
+    HumiditySelection.humidity_ratio: 1e-6,
+    HumiditySelection.vapor_pressure: 1e-6,
+}
+
+
+@pytest.mark.parametrize("units", [UnitSystem.SI.value, UnitSystem.IP.value])
+@pytest.mark.parametrize(
+    "humidity", list(TOLERANCES), ids=[humidity.name for humidity in TOLERANCES]
+)
+def test_humidity_round_trip(humidity, units):
+    tdb, rh = (value.ravel() for value in np.meshgrid(TDB, RH))
+    expected = np.array(
+        [reference(humidity, t, r) for t, r in zip(tdb.tolist(), rh.tolist())]
+    )
+    if units == UnitSystem.IP.value:
+        tdb = tdb * 9 / 5 + 32
+        expected = to_ip(expected, humidity)
+
+    values = from_relative_humidity(rh, humidity.value, tdb, units)
+    np.testing.assert_allclose(values, expected, atol=TOLERANCES[humidity])
+    np.testing.assert_allclose(
+        to_relative_humidity(values, humidity.value, tdb, units), rh, atol=0.01
+    )
+
+
+def test_relative_humidity_unchanged():
+    rh = np.array([30.0, 50.0])
+    value = HumiditySelection.relative_humidity.value
+    assert from_relative_humidity(rh, value, 25) is rh
+    assert to_relative_humidity(rh, value, 25) is rh
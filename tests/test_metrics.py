@@ -0,0 +1,17 @@
+from types import SimpleNamespace
+
+from utils import metrics
+
+
+def test_callback_name(monkeypatch):
+    def update_outputs():
+        pass
+
+    monkeypatch.setattr(metrics, "callback_names", {})
+    dash_app = SimpleNamespace(
+        callback_map={"results.children": {"callback": update_outputs}}
+    )
+    assert metrics.callback_name(dash_app, "results.children") == "update_outputs"
+    # the outputs sent by the clients are not labels unless they are callbacks
+    assert metrics.callback_name(dash_app, "random.output") == "unknown"
+    assert metrics.callback_names == {"results.children": "update_outputs"}
@@ -0,0 +1,187 @@
+import warnings
+
+import numpy as np
+import pytest
+from pythermalcomfort.models import adaptive_en, phs
+
+from components.charts import MET_TO_W_M2, PHS_POSTURE, PHS_WEIGHT, phs_exposure
+from components.input_environmental_personal import input_environmental_personal
+from components.model_registry import MODEL_REGISTRY, scenario_outputs
+from components.show_results import display_results
+from utils.get_inputs import get_inputs
+from utils.my_config_file import (
+    AdaptiveENSpeeds,
+    ElementsIDs,
+    Functionalities,
+    Models,
+    UnitConverter,
+    UnitSystem,
+)
+
+
+def store_inputs(
+    selected_model: str, units: str, functionality: str, form_values: dict = None
+):
+    # same sequence as in the app, the input section is rendered first
+    input_environmental_personal(selected_model, units)
+    values = {
+        model_input.id: model_input.value
+        for model_input in Models[selected_model].value.inputs
+    }
+    values.update(form_values or {})
+    inputs = get_inputs(selected_model, values, units)
+    inputs[ElementsIDs.UNIT_TOGGLE.value] = units
+    inputs[ElementsIDs.MODEL_SELECTION.value] = selected_model
+    inputs[ElementsIDs.functionality_selection.value] = functionality
+    return inputs
+
+
+def texts(component):
+    # text of the dmc.Text components of the results, in order
+    if isinstance(component, (list, tuple)):
+        return [text for child in component for text in texts(child)]
+    children = getattr(component, "children", None)
+    if type(component).__name__ == "Text":
+        return [children]
+    return texts(children) if children is not None else []
+
+
+@pytest.mark.parametrize(
+    "functionality",
+    [Functionalities.Default.value, Functionalities.Sensitivity.value],
+)
+def test_phs_ip(functionality):
+    results = texts(
+        display_results.__wrapped__(
+            store_inputs(Models.PHS.name, UnitSystem.IP.value, functionality)
+        )
+    )
+    assert any(text.startswith("Rectal temperature: ") for text in results)
+    assert not any("nan" in text for text in results)
+
+
+@pytest.mark.parametrize(
+    "functionality",
+    [Functionalities.Default.value, Functionalities.Sensitivity.value],
+)
+def test_fans_heat_ip(functionality):
+    results = texts(
+        display_results.__wrapped__(
+            store_inputs(Models.Fans_heat.name, UnitSystem.IP.value, functionality)
+        )
+    )
+    assert any(text.startswith("Core temperature: ") for text in results)
+    assert not any("nan" in text for text in results)
+
+
+@pytest.mark.parametrize(
+    "selected_model", [Models.Adaptive_ASHRAE.name, Models.Adaptive_EN.name]
+)
+@pytest.mark.parametrize(
+    "functionality",
+    [Functionalities.Default.value, Functionalities.Sensitivity.value],
+)
+def test_adaptive_ip(selected_model, functionality):
+    results = texts(
+        display_results.__wrapped__(
+            store_inputs(selected_model, UnitSystem.IP.value, functionality)
+        )
+    )
+    assert any(text.startswith("Comfort temperature: ") for text in results)
+    assert not any("nan" in text for text in results)
+
+
+@pytest.mark.parametrize(
+    "speed, v",
+    [
+        (AdaptiveENSpeeds.lower_than_06, 0.1),
+        (AdaptiveENSpeeds.speed_06, 0.6),
+        (AdaptiveENSpeeds.speed_09, 0.9),
+        (AdaptiveENSpeeds.speed_12, 1.2),
+    ],
+    ids=lambda value: getattr(value, "name", None),
+)
+def test_adaptive_en_speed_ip(speed, v):
+    # the air speed is selected in m/s in both unit systems
+    inputs = store_inputs(
+        Models.Adaptive_EN.name,
+        UnitSystem.IP.value,
+        Functionalities.Default.value,
+        {ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value: speed.value},
+    )
+    assert inputs[ElementsIDs.v_input.value] == v
+
+    # the model is computed in °C, at 25 °C the upper limit of Category I is
+    # 30.2 °C at 0.6 m/s
+    inputs.update(
+        {
+            ElementsIDs.t_db_input.value: 25.0,
+            ElementsIDs.t_r_input.value: 25.0,
+            ElementsIDs.t_rm_input.value: 25.0,
+        }
+    )
+    expected = adaptive_en(tdb=25, tr=25, t_running_mean=25, v=v)
+    results = texts(display_results.__wrapped__(inputs))
+    for category in ("I", "II", "III"):
+        low, up = (
+            round(
+                UnitConverter.celsius_to_fahrenheit(
+                    expected[f"tmp_cmf_cat_{category.lower()}_{limit}"]
+                ),
+                2,
+            )
+            for limit in ("low", "up")
+        )
+        assert f"Comfort range for Category {category}: {low} - {up}" in results
+    if v == 0.6:
+        assert expected["tmp_cmf_cat_i_up"] == 30.2
+
+
+@pytest.mark.parametrize("selected_model", [Models.PHS.name, Models.Fans_heat.name])
+def test_sensitivity_base(selected_model):
+    # the moved scenarios of the sensitivity analysis are compared with the
+    # output of the results, both are unrounded
+    inputs = store_inputs(
+        selected_model, UnitSystem.SI.value, Functionalities.Sensitivity.value
+    )
+    values = {
+        model_input.id: inputs[model_input.id]
+        for model_input in Models[selected_model].value.inputs
+    }
+    outputs = scenario_outputs.__wrapped__(selected_model, values)
+    for output in MODEL_REGISTRY[selected_model].sensitivity:
+        expected = scenario_outputs.__wrapped__(selected_model, values, output)
+        assert not np.isnan(outputs[output])
+        assert outputs[output] == expected[output]
+
+
+def test_phs_values():
+    inputs = store_inputs(
+        Models.PHS.name, UnitSystem.SI.value, Functionalities.Default.value
+    )
+    with warnings.catch_warnings(record=True):
+        expected = phs(
+            tdb=inputs[ElementsIDs.t_db_input.value],
+            tr=inputs[ElementsIDs.t_r_input.value],
+            v=inputs[ElementsIDs.v_input.value],
+            rh=inputs[ElementsIDs.rh_input.value],
+            met=inputs[ElementsIDs.met_input.value] * MET_TO_W_M2,
+            clo=inputs[ElementsIDs.clo_input.value],
+            posture=PHS_POSTURE,
+            duration=int(inputs[ElementsIDs.duration_input.value]),
+            weight=PHS_WEIGHT,
+        )
+    results = texts(display_results.__wrapped__(inputs))
+    assert f"Rectal temperature: {expected['t_re']}" in results
+    assert f"Water loss: {expected['water_loss']:.0f} g" in results
+    assert (
+        "Maximum allowable exposure time for heat storage: "
+        f"{expected['d_lim_t_re']:.0f} min"
+    ) in results
+
+    # the times of the chart are computed in one call
+    times = np.array([1, 30, 120, 480])
+    with warnings.catch_warnings(record=True):
+        t_re = phs_exposure(inputs, times)["t_re"]
+        for time, value in zip(times, t_re):
+            assert value == phs_exposure(inputs, time)["t_re"]
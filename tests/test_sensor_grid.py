@@ -0,0 +1,144 @@
+import base64
+import io
+import warnings
+
+import numpy as np
+import pytest
+from matplotlib.tri import Triangulation
+from pythermalcomfort.models import pmv_ppd
+from pythermalcomfort.utilities import v_relative, clo_dynamic
+
+from components.sensor_grid import (
+    SENSOR_GRID_COLUMNS,
+    comfortable_area,
+    parse_sensor_grid,
+    sensor_grid_results,
+)
+from utils.my_config_file import Models
+
+MET = 1.2
+CLO = 0.5
+
+
+def grid(tdb):
+    # 3 x 3 sensors 1 m apart, tdb is given for each column of sensors
+    x, y = (value.ravel() for value in np.meshgrid(range(3), range(3)))
+    tdb = np.asarray(tdb, dtype=float)[x]
+    return {
+        "x": x,
+        "y": y,
+        "tdb": tdb,
+        "tr": tdb,
+        "v": np.full(9, 0.1),
+        "rh": np.full(9, 50.0),
+    }
+
+
+def upload(points: dict, columns=SENSOR_GRID_COLUMNS):
+    # contents of dcc.Upload for a csv file with these columns, in any case
+    text = io.StringIO()
+    text.write(",".join(columns) + "\n")
+    np.savetxt(
+        text,
+        np.column_stack(
+            [
+                np.broadcast_to(points[name.lower()], points["x"].shape)
+                for name in columns
+            ]
+        ),
+        delimiter=",",
+    )
+    return "data:text/csv;base64," + base64.b64encode(text.getvalue().encode()).decode()
+
+
+def expected(points: dict):
+    with warnings.catch_warnings(record=True):
+        return pmv_ppd(
+            points["tdb"],
+            points["tr"],
+            v_relative(points["v"], MET),
+            points["rh"],
+            MET,
+            clo_dynamic(CLO, MET),
+            standard="ashrae",
+        )
+
+
+def texts(results: list):
+    return [result.children.children for result in results[:-1]]
+
+
+def test_parse_sensor_grid():
+    points = grid([25, 25, 32])
+    columns = ("RH", "tdb", "x", "tr", "v", "y", "notes")
+    parsed = parse_sensor_grid(upload({**points, "notes": 0}, columns))
+    for name in SENSOR_GRID_COLUMNS:
+        np.testing.assert_allclose(parsed[name], points[name])
+
+
+@pytest.mark.parametrize(
+    "contents, error",
+    [
+        (upload(grid([25] * 3), ("x", "y", "tdb", "tr", "v")), "Missing columns: rh"),
+        (
+            upload({name: value[:2] for name, value in grid([25] * 3).items()}),
+            "between 3 and",
+        ),
+    ],
+    ids=["missing column", "too few sensors"],
+)
+def test_parse_sensor_grid_error(contents, error):
+    with pytest.raises(ValueError, match=error):
+        parse_sensor_grid(contents)
+
+
+def test_comfortable_area():
+    points = grid([25] * 3)
+    triangulation = Triangulation(points["x"], points["y"])
+    assert comfortable_area(triangulation, np.full(9, True)) == 1
+    assert comfortable_area(triangulation, np.full(9, False)) == 0
+    # the cells between the first two columns are comfortable, the triangles
+    # between the last two have one or two comfortable corners out of three
+    assert comfortable_area(triangulation, points["x"] <= 1) == pytest.approx(0.75)
+
+
+def test_sensor_grid_results():
+    points = grid([25, 25, 32])
+    outputs = expected(points)
+    comfortable = np.abs(outputs["pmv"]) <= 0.5
+    assert comfortable.sum() == 6
+
+    results = sensor_grid_results.__wrapped__(
+        Models.PMV_ashrae.name, MET, CLO, upload(points)
+    )
+    assert texts(results) == [
+        "Floor area within -0.5 ≤ PMV ≤ 0.5: 75%",
+        f"Sensors within the range: 6 of 9, mean PPD: {outputs['ppd'].mean():.1f}%",
+        f"PMV: {outputs['pmv'].min():.2f} to {outputs['pmv'].max():.2f}, "
+        "0 sensors outside the limits of the model",
+    ]
+    assert results[-1].src.startswith("data:image/")
+
+
+def test_sensor_grid_outside_limits():
+    # the sensors outside the limits of the model are not counted
+    points = grid([25, 25, 60])
+    outputs = expected(points)
+    assert np.isnan(outputs["pmv"]).sum() == 3
+
+    results = sensor_grid_results.__wrapped__(
+        Models.PMV_ashrae.name, MET, CLO, upload(points)
+    )
+    assert texts(results)[1:] == [
+        f"Sensors within the range: 6 of 9, "
+        f"mean PPD: {np.nanmean(outputs['ppd']):.1f}%",
+        f"PMV: {np.nanmin(outputs['pmv']):.2f} to {np.nanmax(outputs['pmv']):.2f}, "
+        "3 sensors outside the limits of the model",
+    ]
+
+
+def test_sensor_grid_unreadable():
+    results = sensor_grid_results.__wrapped__(
+        Models.PMV_ashrae.name, MET, CLO, "data:text/csv;base64,eCx5Cg=="
+    )
+    assert results[0].children.startswith("The file could not be read")
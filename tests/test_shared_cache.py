@@ -0,0 +1,40 @@
+import os
+import stat
+
+import pytest
+
+from utils import shared_cache
+
+
+def test_private_file(tmp_path):
+    path = tmp_path / "data" / "cache.sqlite"
+    assert shared_cache.private_file(str(path)) == str(path)
+    assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+
+
+@pytest.mark.parametrize("name", ["folder", "file"])
+def test_private_file_refused(tmp_path, name):
+    path = tmp_path / "data" / "cache.sqlite"
+    path.parent.mkdir(mode=0o700)
+    path.touch(mode=0o600)
+    # another user could replace the values unpickled by the cache
+    os.chmod(path.parent if name == "folder" else path, 0o777)
+    with pytest.raises(PermissionError):
+        shared_cache.private_file(str(path))
+
+
+def test_cache_refused_file(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    path.touch(mode=0o666)
+    os.chmod(path, 0o666)
+    monkeypatch.setattr(shared_cache, "CACHE_FILE", str(path))
+    monkeypatch.setattr(shared_cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(shared_cache, "_local", type(shared_cache._local)())
+
+    @shared_cache.shared_cache
+    def square(value):
+        return value**2
+
+    # the values are computed without the cache
+    assert square(3) == 9
+    assert path.stat().st_size == 0
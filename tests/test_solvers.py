@@ -0,0 +1,60 @@
+import warnings
+
+import numpy as np
+import pytest
+from pythermalcomfort.models import cooling_effect as reference_cooling_effect
+
+from components.solvers import cooling_effect
+
+
+def reference(scenarios):
+    with warnings.catch_warnings(record=True):
+        return np.array(
+            [reference_cooling_effect(*scenario) for scenario in scenarios.tolist()]
+        )
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        (25, 25, 0.05, 50, 1.2, 0.5),
+        (25, 25, 0.1, 50, 1.2, 0.5),
+        (28, 28, 0.8, 50, 1.2, 0.5),
+        (30, 30, 1.5, 40, 1.6, 0.4),
+        (20, 20, 1.0, 50, 1.0, 1.0),
+        (10, 40, 2.0, 50, 1.0, 0.0),
+        # the elevated air speed warms the occupant, there is no root
+        (50, 50, 2.0, 90, 1.0, 0.5),
+    ],
+    ids=[
+        "below still air",
+        "still air",
+        "elevated",
+        "warm",
+        "cool",
+        "radiant",
+        "no root",
+    ],
+)
+def test_cooling_effect(scenario):
+    expected = reference(np.array([scenario]))[0]
+    assert cooling_effect(*scenario) == expected
+
+
+def test_cooling_effect_batch():
+    # random scenarios solved in one call, some of them in still air
+    rng = np.random.default_rng(0)
+    scenarios = np.column_stack(
+        [
+            rng.uniform(10, 40, 300),
+            rng.uniform(10, 40, 300),
+            rng.uniform(0, 2, 300),
+            rng.uniform(0, 100, 300),
+            rng.uniform(1, 2, 300),
+            rng.uniform(0, 1.5, 300),
+        ]
+    ).round(2)
+    ce = cooling_effect(*scenarios.T)
+    # same steps as scipy's brentq, also where the SET is not continuous
+    np.testing.assert_array_equal(ce, reference(scenarios))
+    assert np.any(ce == 0) and np.any(ce > 0)
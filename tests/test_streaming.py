@@ -0,0 +1,165 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from flask import Flask
+from pythermalcomfort.models import pmv_ppd
+from pythermalcomfort.utilities import clo_dynamic, v_relative
+
+from utils import streaming
+from utils.my_config_file import Config, ElementsIDs, Models, URLS
+from utils.sensor_feed import synthetic_readings
+
+TOKEN = "test-token"
+# number of sensors sending a reading at once
+STREAM_SENSORS = 100
+
+
+@pytest.fixture(autouse=True)
+def stream_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_FILE", str(tmp_path / "stream.sqlite"))
+    monkeypatch.setattr(streaming, "STREAM_TOKEN", TOKEN)
+
+
+@pytest.fixture
+def client():
+    app = SimpleNamespace(server=Flask(__name__))
+    streaming.init_streaming(app)
+    return app.server.test_client()
+
+
+def post_readings(client, readings, token=TOKEN):
+    return client.post(
+        URLS.STREAM_READINGS.value,
+        json={"readings": readings},
+        headers={"Authorization": f"Bearer {token}"} if token else {},
+    )
+
+
+def test_stream():
+    # synthetic feed, the new readings of all the sensors are computed and
+    # added to their buffers at once
+    rng = np.random.default_rng(0)
+    state = {}
+
+    def ingest():
+        return streaming.add_readings(synthetic_readings(STREAM_SENSORS, state, rng))
+
+    assert ingest() == STREAM_SENSORS
+    delta, seq = streaming.readings_since(0)
+    assert len(delta) == STREAM_SENSORS
+    assert all(len(values["pmv"]) == 1 for values in delta.values())
+
+    # the events only carry the readings added since the last event
+    events = streaming.event_stream(seq, duration=0.5)
+    assert next(events).startswith("retry:")
+    ingest()
+    event = next(events)
+    assert event.startswith(f"id: {seq + STREAM_SENSORS}\n")
+    new = json.loads(event.split("data: ", 1)[1])
+    assert len(new) == STREAM_SENSORS
+    assert all(len(values["pmv"]) == 1 for values in new.values())
+
+
+def test_stream_buffer():
+    # only the last readings of each sensor are kept
+    size = Config.STREAM_BUFFER_SIZE.value
+    readings = [
+        {"sensor": "room-1", "time": index, "tdb": 24, "tr": 24, "v": 0.1, "rh": 50}
+        for index in range(size + 50)
+    ]
+    streaming.add_readings(readings)
+    delta, _ = streaming.readings_since(0)
+    assert delta["room-1"]["time"] == list(range(50, size + 50))
+
+
+def test_stream_values():
+    # met and clo default to the values of the model inputs
+    defaults = {
+        model_input.id: model_input.value
+        for model_input in Models[streaming.STREAM_MODEL].value.inputs
+    }
+    met = defaults[ElementsIDs.met_input.value]
+    clo = clo_dynamic(defaults[ElementsIDs.clo_input.value], met)
+    reading = {"sensor": "room-1", "tdb": 25, "tr": 25, "v": 0.3, "rh": 50}
+    streaming.add_readings([reading, {**reading, "sensor": "room-2", "t_rm": 20}])
+    delta, _ = streaming.readings_since(0)
+
+    expected = pmv_ppd(25, 25, v_relative(0.3, met), 50, met, clo, standard="ashrae")
+    assert delta["room-1"]["pmv"] == [expected["pmv"]]
+    assert delta["room-1"]["ppd"] == [expected["ppd"]]
+    # the adaptive acceptability needs the running mean outdoor temperature
+    assert delta["room-1"]["adaptive"] == [None]
+    assert delta["room-2"]["adaptive"] == [1]
+
+
+@pytest.mark.parametrize("token", [None, "wrong-token"])
+def test_readings_token(client, token):
+    readings = synthetic_readings(2, {}, np.random.default_rng(0))
+    response = post_readings(client, readings, token)
+    assert response.status_code == 401
+    assert streaming.readings_since(0)[0] == {}
+
+
+def test_readings_without_token_set(client, monkeypatch):
+    # the readings are refused when the server has no token
+    monkeypatch.setattr(streaming, "STREAM_TOKEN", None)
+    readings = synthetic_readings(2, {}, np.random.default_rng(0))
+    assert post_readings(client, readings, "None").status_code == 401
+
+
+def test_readings_limits(client):
+    rng = np.random.default_rng(0)
+    response = post_readings(client, synthetic_readings(2, {}, rng))
+    assert response.get_json() == {"accepted": 2}
+
+    # a request with more sensors than the limit is refused
+    sensors = Config.STREAM_MAX_SENSORS.value
+    response = post_readings(client, synthetic_readings(sensors + 1, {}, rng))
+    assert response.status_code == 400
+    assert len(streaming.readings_since(0)[0]) == 2
+
+    reading = {"sensor": "room-1", "tdb": 24, "tr": 24, "v": 0.1, "rh": 50}
+    response = post_readings(client, [reading] * (Config.STREAM_MAX_READINGS.value + 1))
+    assert response.status_code == 400
+
+    response = post_readings(client, [{"sensor": "room-1", "tdb": 24}])
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Missing fields: tr, v, rh"}
+
+
+def test_readings_evicted(client):
+    # the sensors without readings for the longest time make room for the
+    # new ones
+    rng = np.random.default_rng(0)
+    sensors = Config.STREAM_MAX_SENSORS.value
+    post_readings(client, synthetic_readings(sensors, {}, rng))
+    post_readings(client, synthetic_readings(1, {}, rng))
+    reading = {"sensor": "room-1", "tdb": 24, "tr": 24, "v": 0.1, "rh": 50}
+    assert post_readings(client, [reading]).get_json() == {"accepted": 1}
+
+    delta, _ = streaming.readings_since(0)
+    assert len(delta) == sensors
+    assert "room-1" in delta and "sensor-1" in delta
+    assert "sensor-2" not in delta
+
+
+def test_events_limit(monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_MAX_CONNECTIONS", 1)
+    app = SimpleNamespace(server=Flask(__name__))
+    streaming.init_streaming(app)
+    client = app.server.test_client()
+
+    stream = client.get(URLS.STREAM_EVENTS.value, buffered=False)
+    assert stream.status_code == 200
+    assert next(stream.response).startswith(b"retry:")
+    refused = client.get(URLS.STREAM_EVENTS.value)
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == str(streaming.STREAM_BUSY_RETRY_SECONDS)
+
+    # the stream is released when its response is closed
+    stream.close()
+    stream = client.get(URLS.STREAM_EVENTS.value, buffered=False)
+    assert stream.status_code == 200
+    stream.close()
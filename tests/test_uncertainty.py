@@ -0,0 +1,47 @@
+import warnings
+
+import numpy as np
+from pythermalcomfort.models import pmv_ppd
+from pythermalcomfort.utilities import clo_dynamic, v_relative
+
+from components.uncertainty import input_samples, pmv_samples
+from utils.my_config_file import ElementsIDs, Models
+
+SAMPLES = 200
+CHUNK_SIZE = 64
+
+
+def test_pmv_samples():
+    # elevated air speed, the cooling effect varies with all the sampled inputs
+    selected_model = Models.PMV_ashrae.name
+    inputs = {
+        ElementsIDs.t_db_input.value: 27.0,
+        ElementsIDs.t_r_input.value: 27.0,
+        ElementsIDs.v_input.value: 0.8,
+        ElementsIDs.rh_input.value: 50.0,
+        ElementsIDs.met_input.value: 1.2,
+        ElementsIDs.clo_input.value: 0.5,
+    }
+    pmv, ppd = pmv_samples(inputs, selected_model, "ashrae", SAMPLES, CHUNK_SIZE)
+
+    # pythermalcomfort, one sample at a time
+    expected = []
+    for sampled in input_samples(inputs, selected_model, SAMPLES, CHUNK_SIZE):
+        met = sampled[ElementsIDs.met_input.value]
+        for values in zip(
+            v_relative(sampled[ElementsIDs.v_input.value], met),
+            sampled[ElementsIDs.rh_input.value],
+            met,
+            clo_dynamic(sampled[ElementsIDs.clo_input.value], met),
+        ):
+            with warnings.catch_warnings(record=True):
+                result = pmv_ppd(
+                    27.0, 27.0, *values, standard="ashrae", limit_inputs=False
+                )
+            expected.append((result["pmv"], result["ppd"]))
+    expected_pmv, expected_ppd = np.array(expected).T
+
+    # the cooling effects differ by up to 0.01 °C and the PMV is rounded
+    np.testing.assert_allclose(pmv, expected_pmv, atol=0.02)
+    np.testing.assert_allclose(ppd, expected_ppd, atol=0.5)
+    assert np.all(np.abs(np.percentile(pmv - expected_pmv, [5, 50, 95])) <= 0.01)
@@ -0,0 +1,118 @@
+import os
+import time
+import zlib
+
+import brotli
+from flask import request
+from prometheus_client import Histogram
+
+from utils.metrics import DASH_CALLBACK_PATH, callback_name
+
+# responses compressed by the app, the static files are pre-compressed
+COMPRESSED_PATHS = {
+    DASH_CALLBACK_PATH: "callback",
+    "/_dash-layout": "layout",
+    "/_dash-dependencies": "dependencies",
+    "/_dash-component-suites/": "component_suites",
+}
+# the javascript bundles of the components, served from the installed
+# packages, do not change while the app runs and are compressed once
+CACHED_RESPONSES = ("component_suites",)
+# a response smaller than a network packet is not sent faster when compressed
+MIN_SIZE = int(os.environ.get("COMFORT_COMPRESS_MIN_BYTES", 1_024))
+# the large responses are the base64 chart images, which only shrink by the
+# base64 overhead (~1.5x) whatever the level, so the fastest level is used
+LARGE_SIZE = 32_768
+LEVELS = {
+    "br": {"small": 5, "large": 1},
+    "gzip": {"small": 6, "large": 1},
+}
+
+compression_ratio = Histogram(
+    "comfort_compression_ratio",
+    "Uncompressed size divided by compressed size of the responses",
+    ["response", "encoding"],
+    buckets=(1, 1.25, 1.5, 2, 3, 4, 6, 8, 12),
+)
+compression_cpu = Histogram(
+    "comfort_compression_cpu_seconds",
+    "CPU time spent compressing a response",
+    ["response", "encoding"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+)
+
+
+# (path, encoding) -> compressed bundle, a few entries per component package
+_compressed_cache = {}
+
+
+def compress(data: bytes, encoding: str, size: str = None):
+    if size is None:
+        size = "large" if len(data) >= LARGE_SIZE else "small"
+    level = LEVELS[encoding][size]
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    # wbits=31 writes the gzip header and trailer
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _accepted_encoding():
+    for encoding in LEVELS:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def _compressed_path(path: str):
+    # the paths are matched anywhere, the app can be served under a prefix
+    return any(segment in path for segment in COMPRESSED_PATHS)
+
+
+def _response_type(dash_app, path: str):
+    response_type = next(
+        name for segment, name in COMPRESSED_PATHS.items() if segment in path
+    )
+    if response_type == "callback":
+        body = request.get_json(silent=True) or {}
+        return callback_name(dash_app, body.get("output", ""))
+    return response_type
+
+
+def init_compression(dash_app):
+    server = dash_app.server
+
+    @server.after_request
+    def _compress_response(response):
+        if (
+            not _compressed_path(request.path)
+            or response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = _accepted_encoding()
+        data = response.get_data()
+        if encoding is None or len(data) < MIN_SIZE:
+            return response
+
+        response_type = _response_type(dash_app, request.path)
+        cached = response_type in CACHED_RESPONSES
+        key = (request.path, encoding)
+        compressed = _compressed_cache.get(key) if cached else None
+        if compressed is None:
+            start = time.thread_time()
+            # the cached responses are only compressed once, at the better level
+            compressed = compress(data, encoding, "small" if cached else None)
+            cpu_time = time.thread_time() - start
+            compression_ratio.labels(response_type, encoding).observe(
+                len(data) / len(compressed)
+            )
+            compression_cpu.labels(response_type, encoding).observe(cpu_time)
+            if cached:
+                _compressed_cache[key] = compressed
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -2,23 +2,15 @@ from copy import deepcopy
 
 from dash import no_update
 
-from utils.my_config_file import Models, UnitSystem, convert_units, ElementsIDs
-
-
-def find_dict_with_key_value(d, key, value):
-    if isinstance(d, dict):
-        if d.get(key) == value:
-            return d
-        for k, v in d.items():
-            result = find_dict_with_key_value(v, key, value)
-            if result is not None:
-                return result
-    elif isinstance(d, list):
-        for item in d:
-            result = find_dict_with_key_value(item, key, value)
-            if result is not None:
-                return result
-    return None
+from components.solvers import STILL_AIR_SPEED
+from utils.humidity import to_relative_humidity
+from utils.my_config_file import (
+    Models,
+    UnitSystem,
+    convert_units,
+    ElementsIDs,
+    HumiditySelection,
+)
 
 
 def extract_float(value):
@@ -39,7 +31,7 @@ def extract_float(value):
     return None
 
 
-def get_inputs(selected_model: str, form_content: dict, units: str):
+def get_inputs(selected_model: str, form_values: dict, units: str):
     if selected_model is None:
         return no_update
 
@@ -48,10 +40,9 @@ def get_inputs(selected_model: str, form_content: dict, units: str):
 
     # updating the values of the model inputs with the values from the form
     for model_input in list_model_inputs:
-        input_dict = find_dict_with_key_value(form_content, "id", model_input.id)
+        original_value = form_values.get(model_input.id)
 
-        if input_dict and "value" in input_dict:
-            original_value = input_dict["value"]
+        if original_value is not None:
             converted_value = extract_float(str(original_value))
 
             if converted_value is not None:
@@ -68,7 +59,34 @@ def get_inputs(selected_model: str, form_content: dict, units: str):
     model_inputs_dict = {
         input.id: input for input in Models[selected_model].value.inputs
     }
+    # the humidity can be entered in other units, the models use the relative humidity
+    humidity = (
+        form_values.get(ElementsIDs.HUMIDITY_SELECTION.value)
+        or HumiditySelection.relative_humidity.value
+    )
+    # the EN adaptive air speed is selected in m/s in both unit systems, the
+    # speeds lower than 0.6 m/s have no cooling effect and use still air
+    speed = form_values.get(ElementsIDs.ADAPTIVE_EN_SPEED_SELECTION.value)
     for model_input in list_model_inputs:
+        if model_input.id == ElementsIDs.v_input.value and speed is not None:
+            inputs[model_input.id] = extract_float(speed) or STILL_AIR_SPEED
+            continue
+        if (
+            model_input.id == ElementsIDs.rh_input.value
+            and humidity != HumiditySelection.relative_humidity.value
+        ):
+            # the air temperature precedes the humidity in the model inputs
+            model_input.value = round(
+                float(
+                    to_relative_humidity(
+                        model_input.value,
+                        humidity,
+                        inputs[ElementsIDs.t_db_input.value],
+                        units,
+                    )
+                ),
+                2,
+            )
         if model_input.min <= model_input.value <= model_input.max:
             inputs[model_input.id] = model_input.value
         else:
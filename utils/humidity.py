@@ -0,0 +1,147 @@
+import numpy as np
+import psychrolib
+
+from utils.my_config_file import HumiditySelection, ModelInputsInfo, UnitSystem
+
+psychrolib.SetUnitSystem(psychrolib.SI)
+
+P_ATMOSPHERIC = 101325.0
+PA_PER_INHG = 3386.389
+
+# unit, min, max and step of the humidity input for each unit system, the
+# relative humidity uses the values of the model inputs
+HUMIDITY_INPUTS = {
+    HumiditySelection.humidity_ratio: {
+        UnitSystem.SI.value: ("g/kg", 0.0, 30.0, 0.1),
+        UnitSystem.IP.value: ("lb/klb", 0.0, 30.0, 0.1),
+    },
+    HumiditySelection.dew_point: {
+        UnitSystem.SI.value: (UnitSystem.celsius.value, -20.0, 40.0, 0.1),
+        UnitSystem.IP.value: (UnitSystem.fahrenheit.value, -4.0, 104.0, 0.1),
+    },
+    HumiditySelection.wet_bulb: {
+        UnitSystem.SI.value: (UnitSystem.celsius.value, 0.0, 40.0, 0.1),
+        UnitSystem.IP.value: (UnitSystem.fahrenheit.value, 32.0, 104.0, 0.1),
+    },
+    HumiditySelection.vapor_pressure: {
+        UnitSystem.SI.value: ("kPa", 0.0, 7.5, 0.01),
+        UnitSystem.IP.value: ("inHg", 0.0, 2.2, 0.01),
+    },
+}
+
+# the dew point is the inverse of the saturation vapour pressure, which
+# psychrolib solves iteratively for each value (~10 µs per value). The curve
+# does not depend on the pressure, so it is tabulated once over the range of
+# psychrolib and inverted by interpolating its logarithm, error < 0.002 °C
+SATURATION_TEMPERATURES = np.arange(-100, 200.05, 0.1)
+SATURATION_LOG_PRESSURES = np.log(psychrolib.GetSatVapPres(SATURATION_TEMPERATURES))
+
+
+def _to_si(value, humidity: HumiditySelection, units: str):
+    # converts to the units used by psychrolib: °C, kg/kg and Pa
+    value = np.asarray(value, dtype=float)
+    if humidity == HumiditySelection.humidity_ratio:
+        return value / 1000
+    if humidity == HumiditySelection.vapor_pressure:
+        return value * (PA_PER_INHG if units == UnitSystem.IP.value else 1000)
+    if humidity != HumiditySelection.relative_humidity and units == UnitSystem.IP.value:
+        return (value - 32) * 5 / 9
+    return value
+
+
+def _from_si(value, humidity: HumiditySelection, units: str):
+    if humidity == HumiditySelection.humidity_ratio:
+        return value * 1000
+    if humidity == HumiditySelection.vapor_pressure:
+        return value / (PA_PER_INHG if units == UnitSystem.IP.value else 1000)
+    if humidity != HumiditySelection.relative_humidity and units == UnitSystem.IP.value:
+        return value * 9 / 5 + 32
+    return value
+
+
+def _tdb_si(tdb, units: str):
+    tdb = np.asarray(tdb, dtype=float)
+    return (tdb - 32) * 5 / 9 if units == UnitSystem.IP.value else tdb
+
+
+def vapor_pressure(value, humidity: HumiditySelection, tdb, p_atm=P_ATMOSPHERIC):
+    # SI values, arrays are converted element-wise in a single call
+    if humidity == HumiditySelection.relative_humidity:
+        return value / 100 * psychrolib.GetSatVapPres(tdb)
+    if humidity == HumiditySelection.dew_point:
+        return psychrolib.GetSatVapPres(value)
+    if humidity == HumiditySelection.vapor_pressure:
+        return value
+    if humidity == HumiditySelection.wet_bulb:
+        # psychrolib rejects the whole array if one wet bulb is above the dry bulb
+        invalid = value > tdb
+        value = psychrolib.GetHumRatioFromTWetBulb(
+            tdb, np.where(invalid, tdb, value), p_atm
+        )
+        value = np.where(invalid, np.nan, value)
+    # the invalid values are returned as nan
+    with np.errstate(invalid="ignore"):
+        return psychrolib.GetVapPresFromHumRatio(
+            np.where(value >= 0, value, np.nan), p_atm
+        )
+
+
+def to_relative_humidity(
+    value, humidity: str, tdb, units: str = UnitSystem.SI.value, p_atm=P_ATMOSPHERIC
+):
+    # values above 100% are returned as is, they are rejected by the range check
+    humidity = HumiditySelection(humidity)
+    if humidity == HumiditySelection.relative_humidity:
+        return value
+    tdb = _tdb_si(tdb, units)
+    value = _to_si(value, humidity, units)
+    return (
+        100
+        * vapor_pressure(value, humidity, tdb, p_atm)
+        / (psychrolib.GetSatVapPres(tdb))
+    )
+
+
+def from_relative_humidity(
+    rh, humidity: str, tdb, units: str = UnitSystem.SI.value, p_atm=P_ATMOSPHERIC
+):
+    humidity = HumiditySelection(humidity)
+    if humidity == HumiditySelection.relative_humidity:
+        return rh
+    tdb = _tdb_si(tdb, units)
+    rh = np.clip(np.asarray(rh, dtype=float) / 100, 0, 1)
+    if humidity == HumiditySelection.wet_bulb:
+        value = psychrolib.GetTWetBulbFromRelHum(tdb, rh, p_atm)
+    else:
+        pv = rh * psychrolib.GetSatVapPres(tdb)
+        if humidity == HumiditySelection.humidity_ratio:
+            value = psychrolib.GetHumRatioFromVapPres(pv, p_atm)
+        elif humidity == HumiditySelection.dew_point:
+            with np.errstate(divide="ignore"):
+                value = np.interp(
+                    np.log(pv), SATURATION_LOG_PRESSURES, SATURATION_TEMPERATURES
+                )
+        else:
+            value = pv
+    return _from_si(value, humidity, units)
+
+
+def humidity_input(
+    model_input: ModelInputsInfo, humidity: str, tdb, units: str
+) -> ModelInputsInfo:
+    # the relative humidity input of a model shown in the selected humidity unit
+    humidity = HumiditySelection(humidity)
+    if humidity == HumiditySelection.relative_humidity:
+        return model_input
+    unit, minimum, maximum, step = HUMIDITY_INPUTS[humidity][units]
+    return ModelInputsInfo(
+        unit=unit,
+        min=minimum,
+        max=maximum,
+        step=step,
+        value=round(
+            float(from_relative_humidity(model_input.value, humidity, tdb, units)), 2
+        ),
+        name=humidity.value,
+        id=model_input.id,
+    )
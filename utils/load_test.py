@@ -0,0 +1,343 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from copy import deepcopy
+from urllib.parse import urlencode
+
+import numpy as np
+import requests
+from flask import request
+
+from utils.get_inputs import get_inputs
+from utils.metrics import DASH_CALLBACK_PATH, callback_name
+from utils.my_config_file import (
+    ElementsIDs,
+    Functionalities,
+    Models,
+    MyStores,
+    UnitSystem,
+    convert_units,
+)
+
+# set to a .jsonl file to save every callback request sent by the browsers
+RECORD_FILE = os.environ.get("COMFORT_RECORD_PAYLOADS")
+# chart container measured by the browser, see pages/home.py
+DISPLAY = {"width": 600, "dpr": 2, "webp": True}
+_record_lock = threading.Lock()
+
+
+def init_recorder(dash_app):
+    if not RECORD_FILE:
+        return
+
+    @dash_app.server.before_request
+    def _record_payload():
+        if request.path.endswith(DASH_CALLBACK_PATH):
+            line = json.dumps(request.get_json(silent=True))
+            with _record_lock, open(RECORD_FILE, "a") as f:
+                f.write(line + "\n")
+
+
+def _outputs(output: str):
+    # "..a.prop...b.prop.." for multi outputs, "a.prop" for a single one
+    if output.startswith(".."):
+        outputs = []
+        for item in output.strip(".").split("..."):
+            component_id, prop = item.split(".", 1)
+            outputs.append({"id": component_id, "property": prop})
+        return outputs
+    component_id, prop = output.split(".", 1)
+    return {"id": component_id, "property": prop}
+
+
+class PayloadBuilder:
+    # builds the same request bodies that the Dash renderer sends, using the
+    # callback definitions served by /_dash-dependencies
+    def __init__(self, dependencies: list):
+        self.callbacks = {}
+        for dependency in dependencies:
+            first_output = dependency["output"].strip(".").split("...")[0]
+            self.callbacks[first_output.split(".")[0]] = dependency
+
+    def payload(self, output: str, values: dict, changed: list):
+        dependency = self.callbacks[output]
+        return {
+            "output": dependency["output"],
+            "outputs": _outputs(dependency["output"]),
+            "inputs": [
+                dict(item, value=values.get(f"{item['id']}.{item['property']}"))
+                for item in dependency["inputs"]
+            ],
+            "changedPropIds": changed,
+            "state": [
+                dict(item, value=values.get(f"{item['id']}.{item['property']}"))
+                for item in dependency["state"]
+            ],
+        }
+
+
+def _form_values(selected_model: str, units: str, **overrides):
+    # default values of the inputs, in the units displayed in the form
+    model_inputs = convert_units(deepcopy(Models[selected_model].value.inputs), units)
+    values = {
+        f"{model_input.id}.value": model_input.value for model_input in model_inputs
+    }
+    values.update({f"{key}.value": value for key, value in overrides.items()})
+    values[f"{ElementsIDs.inputs_form.value}.n_clicks"] = 1
+    values[f"{ElementsIDs.UNIT_TOGGLE.value}.checked"] = units == UnitSystem.IP.value
+    values[f"{ElementsIDs.chart_selected.value}.value"] = (
+        Models[selected_model].value.charts[0].name
+    )
+    values[f"{ElementsIDs.functionality_selection.value}.value"] = (
+        Functionalities.Default.value
+    )
+    values[f"{ElementsIDs.MODEL_SELECTION.value}.value"] = selected_model
+    return values
+
+
+def _store_data(values: dict):
+    # what update_store_inputs saves in the store for these form values
+    selected_model = values[f"{ElementsIDs.MODEL_SELECTION.value}.value"]
+    units = (
+        UnitSystem.IP.value
+        if values[f"{ElementsIDs.UNIT_TOGGLE.value}.checked"]
+        else UnitSystem.SI.value
+    )
+    form_values = {
+        key.split(".")[0]: value
+        for key, value in values.items()
+        if key.endswith(".value")
+    }
+    inputs = get_inputs(selected_model, form_values, units)
+    inputs[ElementsIDs.UNIT_TOGGLE.value] = units
+    inputs[ElementsIDs.MODEL_SELECTION.value] = selected_model
+    inputs[ElementsIDs.chart_selected.value] = values[
+        f"{ElementsIDs.chart_selected.value}.value"
+    ]
+    inputs[ElementsIDs.functionality_selection.value] = values[
+        f"{ElementsIDs.functionality_selection.value}.value"
+    ]
+    return inputs
+
+
+def _store_update(builder: PayloadBuilder, values: dict, changed: str):
+    # a change of the inputs updates the store, which triggers the results and,
+    # once the browser has measured the chart container, the chart
+    store = _store_data(values)
+    values = dict(values)
+    values[f"{MyStores.input_data.value}.data"] = store
+    values[f"{MyStores.chart_display.value}.data"] = DISPLAY
+    store_changed = [f"{MyStores.input_data.value}.data"]
+    display_changed = [f"{MyStores.chart_display.value}.data"]
+    return [
+        builder.payload(MyStores.input_data.value, values, [changed]),
+        builder.payload(ElementsIDs.CHART_CONTAINER.value, values, display_changed),
+        builder.payload(ElementsIDs.RESULTS_SECTION.value, values, store_changed),
+    ]
+
+
+def flow_model_switch(builder: PayloadBuilder):
+    payloads = []
+    for model in Models:
+        values = _form_values(model.name, UnitSystem.SI.value)
+        values[f"{ElementsIDs.URL.value}.search"] = f"?{urlencode(_store_data(values))}"
+        changed = [f"{ElementsIDs.MODEL_SELECTION.value}.value"]
+        payloads.append(builder.payload(ElementsIDs.note_model.value, values, changed))
+        payloads.append(
+            builder.payload(ElementsIDs.charts_dropdown.value, values, changed)
+        )
+        payloads.append(
+            builder.payload(
+                ElementsIDs.MODEL_SELECTION.value,
+                values,
+                [f"{ElementsIDs.URL.value}.search"],
+            )
+        )
+        payloads += _store_update(
+            builder, values, f"{ElementsIDs.chart_selected.value}.value"
+        )
+    return payloads
+
+
+def flow_input_drag(builder: PayloadBuilder):
+    payloads = []
+    for t_db in np.arange(20, 30.5, 0.5):
+        values = _form_values(
+            Models.PMV_ashrae.name,
+            UnitSystem.SI.value,
+            **{ElementsIDs.t_db_input.value: float(t_db)},
+        )
+        payloads += _store_update(
+            builder, values, f"{ElementsIDs.t_db_input.value}.value"
+        )
+    return payloads
+
+
+def flow_chart_switch(builder: PayloadBuilder):
+    payloads = []
+    for chart in Models.PMV_ashrae.value.charts:
+        values = _form_values(Models.PMV_ashrae.name, UnitSystem.SI.value)
+        values[f"{ElementsIDs.chart_selected.value}.value"] = chart.name
+        payloads += _store_update(
+            builder, values, f"{ElementsIDs.chart_selected.value}.value"
+        )
+    return payloads
+
+
+def flow_unit_toggle(builder: PayloadBuilder):
+    payloads = []
+    for units in [UnitSystem.IP.value, UnitSystem.SI.value]:
+        values = _form_values(Models.PMV_ashrae.name, units)
+        values[f"{ElementsIDs.URL.value}.search"] = f"?{urlencode(_store_data(values))}"
+        payloads += _store_update(
+            builder, values, f"{ElementsIDs.UNIT_TOGGLE.value}.checked"
+        )
+        payloads.append(
+            builder.payload(
+                ElementsIDs.MODEL_SELECTION.value,
+                values,
+                [f"{ElementsIDs.URL.value}.search"],
+            )
+        )
+    return payloads
+
+
+FLOWS = {
+    "model_switch": flow_model_switch,
+    "input_drag": flow_input_drag,
+    "chart_switch": flow_chart_switch,
+    "unit_toggle": flow_unit_toggle,
+}
+
+
+def load_recorded(path: str):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class FlaskClient:
+    def __init__(self, dash_app):
+        self.server = dash_app.server
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = self.server.test_client()
+        return self._local.client
+
+    def get_json(self, path: str):
+        return self._client().get(path).get_json()
+
+    def post(self, path: str, payload: dict):
+        return self._client().post(path, json=payload).status_code
+
+
+class HttpClient:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def get_json(self, path: str):
+        return self._client().get(self.url + path).json()
+
+    def post(self, path: str, payload: dict):
+        return self._client().post(self.url + path, json=payload).status_code
+
+
+def run(dash_app, client, flows: dict, concurrency: int, iterations: int):
+    # every worker replays all the flows, one request at a time, like a browser
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(iterations):
+            for payloads in flows.values():
+                for payload in payloads:
+                    start = time.perf_counter()
+                    status = client.post(DASH_CALLBACK_PATH, payload)
+                    elapsed = time.perf_counter() - start
+                    name = callback_name(dash_app, payload["output"])
+                    with lock:
+                        samples[name].append(elapsed)
+                        if status >= 500:
+                            errors[name] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors, time.perf_counter() - start
+
+
+def report(samples: dict, errors: dict, duration: float):
+    header = f"{'callback':<32}{'count':>7}{'errors':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>8}"
+    lines = [header, "-" * len(header)]
+    for name, latencies in sorted(samples.items()):
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        lines.append(
+            f"{name:<32}{len(latencies):>7}{errors[name]:>7}"
+            f"{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{len(latencies) / duration:>8.1f}"
+        )
+    total = sum(len(latencies) for latencies in samples.values())
+    lines.append("-" * len(header))
+    lines.append(f"{total} requests in {duration:.1f} s, {total / duration:.1f} req/s")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay Dash callback requests and report their latency."
+    )
+    parser.add_argument(
+        "--url",
+        help="URL of a running server, by default the requests are sent to "
+        "app.server with the Flask test client",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument(
+        "--flows",
+        nargs="*",
+        default=list(FLOWS),
+        choices=list(FLOWS),
+        help="built-in flows to replay",
+    )
+    parser.add_argument(
+        "--recorded",
+        nargs="*",
+        default=[],
+        help=".jsonl files saved with COMFORT_RECORD_PAYLOADS",
+    )
+    args = parser.parse_args()
+
+    from app import app as dash_app
+
+    # the first request initialises the Dash app, e.g. the callback map used
+    # to name the callbacks in the report
+    dash_app.server.test_client().get("/_dash-layout")
+    client = HttpClient(args.url) if args.url else FlaskClient(dash_app)
+    builder = PayloadBuilder(client.get_json("/_dash-dependencies"))
+
+    flows = {name: FLOWS[name](builder) for name in args.flows}
+    for path in args.recorded:
+        flows[os.path.basename(path)] = load_recorded(path)
+
+    samples, errors, duration = run(
+        dash_app, client, flows, args.concurrency, args.iterations
+    )
+    print(report(samples, errors, duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from utils.my_config_file import URLS
+
+# endpoint used by the Dash renderer for all the callbacks
+DASH_CALLBACK_PATH = "/_dash-update-component"
+# requests sent by wsgi.warm_up, which are not recorded
+WARM_UP_HEADER = "X-Comfort-Warm-Up"
+
+BYTES_BUCKETS = (256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304)
+
+callback_latency = Histogram(
+    "comfort_callback_latency_seconds",
+    "Time spent serving a Dash callback",
+    ["callback"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+callback_request_bytes = Histogram(
+    "comfort_callback_request_bytes",
+    "Size of the Dash callback request body",
+    ["callback"],
+    buckets=BYTES_BUCKETS,
+)
+callback_response_bytes = Histogram(
+    "comfort_callback_response_bytes",
+    "Size of the Dash callback response body",
+    ["callback"],
+    buckets=BYTES_BUCKETS,
+)
+callback_errors = Counter(
+    "comfort_callback_errors_total",
+    "Dash callbacks that returned a server error",
+    ["callback"],
+)
+cache_requests = Counter(
+    "comfort_cache_requests_total",
+    "Cache lookups, labelled by cache name and result (hit or miss)",
+    ["cache", "result"],
+)
+
+
+def record_cache(cache: str, hit: bool):
+    # the hit ratio is hit / (hit + miss) for a given cache label
+    cache_requests.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+# maps the Dash output string of each callback to the name of its function
+callback_names: dict = {}
+# label of the requests whose output is not a callback of the app, the output
+# comes from the request body and is not used as a label nor cached
+UNKNOWN_CALLBACK = "unknown"
+
+
+def callback_name(dash_app, output: str):
+    if output not in callback_names:
+        func = dash_app.callback_map.get(output, {}).get("callback")
+        if func is None:
+            return UNKNOWN_CALLBACK
+        callback_names[output] = func.__name__
+    return callback_names[output]
+
+
+def init_metrics(dash_app):
+    server = dash_app.server
+
+    @server.before_request
+    def _start_timer():
+        if request.path.endswith(DASH_CALLBACK_PATH) and not request.headers.get(
+            WARM_UP_HEADER
+        ):
+            g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def _record_callback(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        body = request.get_json(silent=True) or {}
+        name = callback_name(dash_app, body.get("output", ""))
+        callback_latency.labels(name).observe(time.perf_counter() - start)
+        callback_request_bytes.labels(name).observe(request.content_length or 0)
+        callback_response_bytes.labels(name).observe(response.content_length or 0)
+        if response.status_code >= 500:
+            callback_errors.labels(name).inc()
+        return response
+
+    @server.route(URLS.METRICS.value)
+    def _metrics():
+        registry = REGISTRY
+        # when running with several worker processes each one writes its
+        # samples in this folder and they are aggregated when scraped
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -37,6 +37,7 @@ class ElementsIDs(Enum):
     rh_input = "id-rh-input"
     met_input = "id-met-input"
     clo_input = "id-clo-input"
+    duration_input = "id-duration-input"
     note_model = "id-model-note"
     modal_custom_ensemble = "id-modal-custom-ensemble"
     modal_custom_ensemble_open = "id-modal-custom-ensemble-open"
@@ -46,6 +47,11 @@ class ElementsIDs(Enum):
     modal_custom_ensemble_warning = "id-modal-custom-ensemble-warning"
     functionality_selection = "id-functionality-selection"
     RESULTS_SECTION = "id-results-section"
+    SENSOR_GRID_SECTION = "id-sensor-grid-section"
+    SENSOR_GRID_UPLOAD = "id-sensor-grid-upload"
+    SENSOR_GRID_RESULTS = "id-sensor-grid-results"
+    LIVE_CHART = "id-live-chart"
+    LIVE_STREAM = "id-live-stream"
     NAVBAR_ID_DOCUMENT = "id-nav-documentation"
     NAVBAR_ID_MORE_CBE_TOOLS = "id-nav-more-cbe-tools"
     HUMIDITY_SELECTION = "id-humidity-selection"
@@ -60,12 +66,33 @@ class ElementsIDs(Enum):
 class Config(Enum):
     # DEBUG: bool = False
     DEBUG: bool = "macOS" in platform.platform() or "Windows" in platform.platform()
+    # delay in ms before a number input sends its value to the server
+    INPUT_DEBOUNCE: int = 500
+    # number of points along each axis of the air speed chart grid
+    AIR_SPEED_CHART_RESOLUTION: int = 40
+    # number of points along each axis of the fans and heat chart grid
+    FANS_HEAT_CHART_RESOLUTION: int = 80
+    # samples of the uncertainty functionality, evaluated in chunks
+    MONTE_CARLO_SAMPLES: int = 100_000
+    MONTE_CARLO_CHUNK_SIZE: int = 10_000
+    # maximum number of sensors in an uploaded sensor grid
+    SENSOR_GRID_MAX_POINTS: int = 20_000
+    # readings kept for each live sensor, and interval in s between the
+    # updates pushed to the live chart
+    STREAM_BUFFER_SIZE: int = 600
+    STREAM_PUSH_INTERVAL: float = 0.25
+    # live sensors with readings in the buffers, and readings in one request
+    STREAM_MAX_SENSORS: int = 200
+    STREAM_MAX_READINGS: int = 2_000
 
 
 class Functionalities(Enum):
     Default: str = "Default"
     Compare: str = "Compare"
     Ranges: str = "Ranges"
+    Uncertainty: str = "Uncertainty"
+    Sensitivity: str = "Sensitivity"
+    SensorGrid: str = "Sensor grid"
 
 
 class URLS(Enum):
@@ -73,6 +100,12 @@ class URLS(Enum):
     ABOUT: str = "/about"
     DOCUMENTAION: str = "/documentation"
     TOOLS: str = "/moreCBETools"
+    METRICS: str = "/metrics"
+    PROFILES: str = "/profiles"
+    LIVE: str = "/live"
+    STREAM_READINGS: str = "/stream/readings"
+    STREAM_EVENTS: str = "/stream/events"
+    VENDOR: str = "/vendor"
 
 
 class ToolUrls(Enum):
@@ -90,6 +123,7 @@ class ToolUrls(Enum):
 
 class MyStores(Enum):
     input_data = "store_input_data"
+    chart_display = "store_chart_display"
 
 
 class ChartsInfo(BaseModel):
@@ -129,6 +163,16 @@ class Charts(Enum):
         id="id_set_outputs_chart",
         note_chart="This chart shows how some variables, calculated using the SET model, vary as a function of the input parameters you selected. You can toggle on and off the lines by clicking on the relative variable in the legend.",
     )
+    phs_exposure: ChartsInfo = ChartsInfo(
+        name="Rectal temperature and water loss vs. exposure time",
+        id="id_phs_exposure_chart",
+        note_chart="This chart shows how the rectal temperature and the water loss predicted by the PHS model evolve during the exposure. The dashed lines are the limits used to calculate the maximum allowable exposure times, a rectal temperature of 38 °C and a water loss of 5% (95% of the working population) and 7.5% (mean subject) of the body mass.",
+    )
+    fans_heat: ChartsInfo = ChartsInfo(
+        name="Heat strain vs. air temperature and air speed",
+        id="id_fans_heat_chart",
+        note_chart="This chart shows the combinations of air temperature and air speed for which the two-node model predicts heat strain, i.e. the skin blood flow, the skin wettedness or the sweat rate reach their physiological limit. Each point of the chart has a mean radiant temperature equal to the air temperature. In the heat strain region, a fan is beneficial where the core temperature is lower than in still air (0.1 m/s) and detrimental where it is higher.",
+    )
     pmot_ot: ChartsInfo = ChartsInfo(
         name="Adaptive chart",
         id="id_pmot_ot_chart",
@@ -460,6 +504,191 @@ class Models(Enum):
             ),
         ],
     )
+    Adaptive_EN: ModelsInfo = ModelsInfo(
+        name="Adaptive - EN 16798",
+        description="Adaptive - EN 16798",
+        note_model="The adaptive model of EN 16798-1 applies to buildings without mechanical cooling, in which the occupants have sedentary activities, can freely adapt their clothing and can open the windows. The comfort limits are given for the three categories of expectation. An elevated air speed raises the upper limits when the operative temperature is above 25 °C.",
+        charts=[
+            Charts.pmot_ot.value,
+        ],
+        inputs=[
+            ModelInputsInfo(
+                unit=UnitSystem.celsius.value,
+                min=10.0,
+                max=40.0,
+                step=0.5,
+                value=25.0,
+                name="Air Temperature",
+                id=ElementsIDs.t_db_input.value,
+            ),
+            ModelInputsInfo(
+                unit=UnitSystem.celsius.value,
+                min=10.0,
+                max=40.0,
+                step=0.5,
+                value=25.0,
+                name="Mean Radiant Temperature",
+                id=ElementsIDs.t_r_input.value,
+            ),
+            ModelInputsInfo(
+                unit=UnitSystem.celsius.value,
+                min=10.0,
+                max=30.0,
+                step=0.5,
+                value=25.0,
+                name="Prevailing mean outdoor temperature",
+                id=ElementsIDs.t_rm_input.value,
+            ),
+            # entered with the air speed selection, the speeds lower than
+            # 0.6 m/s use still air, 0.1 m/s
+            ModelInputsInfo(
+                unit=UnitSystem.m_s.value,
+                min=0.0,
+                max=1.2,
+                step=0.1,
+                value=0.1,
+                name="Air Speed",
+                id=ElementsIDs.v_input.value,
+            ),
+        ],
+    )
+    Fans_heat: ModelsInfo = ModelsInfo(
+        name="Use fans in heatwaves",
+        description="Use fans in heatwaves",
+        note_model="This model uses the two-node model to estimate whether using an electric fan in a hot environment reduces the heat strain of the occupants. The model is only applicable for air and mean radiant temperatures between 20 and 50 °C, air speeds between 0.1 and 4.5 m/s, metabolic rates between 0.7 and 2 met and clothing insulations up to 1 clo.",
+        charts=[
+            Charts.fans_heat.value,
+        ],
+        inputs=[
+            ModelInputsInfo(
+                unit=UnitSystem.celsius.value,
+                min=20.0,
+                max=50.0,
+                step=0.5,
+                value=39.0,
+                name="Air Temperature",
+                id=ElementsIDs.t_db_input.value,
+            ),
+            ModelInputsInfo(
+                unit=UnitSystem.celsius.value,
+                min=20.0,
+                max=50.0,
+                step=0.5,
+                value=39.0,
+                name="Mean Radiant Temperature",
+                id=ElementsIDs.t_r_input.value,
+            ),
+            ModelInputsInfo(
+                unit=UnitSystem.m_s.value,
+                min=0.1,
+                max=4.5,
+                step=0.1,
+                value=0.8,
+                name="Air Speed",
+                id=ElementsIDs.v_input.value,
+            ),
+            ModelInputsInfo(
+                unit="%",
+                min=0.0,
+                max=100.0,
+                step=1.0,
+                value=50.0,
+                name="Relative Humidity",
+                id=ElementsIDs.rh_input.value,
+            ),
+            ModelInputsInfo(
+                unit="met",
+                min=0.7,
+                max=2.0,
+                step=0.1,
+                value=1.1,
+                name="Metabolic Rate",
+                id=ElementsIDs.met_input.value,
+            ),
+            ModelInputsInfo(
+                unit="clo",
+                min=0.0,
+                max=1.0,
+                step=0.1,
+                value=0.5,
+                name="Clothing Level",
+                id=ElementsIDs.clo_input.value,
+            ),
+        ],
+    )
+    PHS: ModelsInfo = ModelsInfo(
+        name="PHS - ISO 7933",
+        description="Predicted Heat Strain - ISO 7933",
+        note_model="The PHS model predicts the sweat rate and the rectal temperature of a standing subject working in a hot environment. The model is only applicable for air temperatures between 15 and 50 °C, mean radiant temperatures between 0 and 60 °C, air speeds below 3 m/s, metabolic rates between 100 and 450 W/m² (1.7 to 7.7 met) and clothing insulations between 0.1 and 1 clo.",
+        charts=[
+            Charts.phs_exposure.value,
+        ],
+        inputs=[
+            ModelInputsInfo(
+                unit=UnitSystem.celsius.value,
+                min=15.0,
+                max=50.0,
+                step=0.5,
+                value=40.0,
+                name="Air Temperature",
+                id=ElementsIDs.t_db_input.value,
+            ),
+            ModelInputsInfo(
+                unit=UnitSystem.celsius.value,
+                min=0.0,
+                max=60.0,
+                step=0.5,
+                value=40.0,
+                name="Mean Radiant Temperature",
+                id=ElementsIDs.t_r_input.value,
+            ),
+            ModelInputsInfo(
+                unit=UnitSystem.m_s.value,
+                min=0.0,
+                max=3.0,
+                step=0.1,
+                value=0.3,
+                name="Air Speed",
+                id=ElementsIDs.v_input.value,
+            ),
+            ModelInputsInfo(
+                unit="%",
+                min=0.0,
+                max=100.0,
+                step=1.0,
+                value=35.0,
+                name="Relative Humidity",
+                id=ElementsIDs.rh_input.value,
+            ),
+            ModelInputsInfo(
+                unit="met",
+                min=1.7,
+                max=7.7,
+                step=0.1,
+                value=2.6,
+                name="Metabolic Rate",
+                id=ElementsIDs.met_input.value,
+            ),
+            ModelInputsInfo(
+                unit="clo",
+                min=0.1,
+                max=1.0,
+                step=0.1,
+                value=0.5,
+                name="Clothing Level",
+                id=ElementsIDs.clo_input.value,
+            ),
+            ModelInputsInfo(
+                unit="min",
+                min=1.0,
+                max=960.0,
+                step=10.0,
+                value=480.0,
+                name="Exposure Duration",
+                id=ElementsIDs.duration_input.value,
+            ),
+        ],
+    )
 
 
 # PMV - Ashare right selection
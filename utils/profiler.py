@@ -0,0 +1,157 @@
+import cProfile
+import functools
+import html
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import abort, has_request_context, request, send_from_directory
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from utils.my_config_file import URLS
+
+# set to "1" to profile every call of the decorated callbacks
+PROFILE_ENABLED = os.environ.get("COMFORT_PROFILE", "0").lower() in ("1", "true")
+# secret used to sign the ?profile=<token> query parameter, see make_profile_token
+PROFILE_SECRET = os.environ.get("COMFORT_PROFILE_SECRET")
+PROFILE_DIR = os.environ.get("COMFORT_PROFILE_DIR", "profiles")
+PROFILE_KEEP = 50
+TOKEN_MAX_AGE = 3600
+TOKEN_COOKIE = "comfort_profile"
+TOP_FUNCTIONS = 15
+
+# only one callback invocation is profiled at a time
+_profile_lock = threading.Lock()
+
+
+def _serializer():
+    return URLSafeTimedSerializer(PROFILE_SECRET, salt="comfort-profile")
+
+
+def make_profile_token():
+    return _serializer().dumps("profile")
+
+
+def _valid_token(token):
+    if not PROFILE_SECRET or not token:
+        return False
+    try:
+        _serializer().loads(token, max_age=TOKEN_MAX_AGE)
+    except BadSignature:
+        return False
+    return True
+
+
+def _profiling_requested():
+    if PROFILE_ENABLED:
+        return True
+    if not has_request_context():
+        return False
+    return _valid_token(request.args.get("profile")) or _valid_token(
+        request.cookies.get(TOKEN_COOKIE)
+    )
+
+
+def _write_profile(name: str, duration: float, profiler: cProfile.Profile):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    file_name = f"{stamp}_{name}_{duration * 1000:.0f}ms.prof"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, file_name))
+
+    # only keep the most recent profiles
+    for old in _list_profiles()[PROFILE_KEEP:]:
+        os.remove(os.path.join(PROFILE_DIR, old))
+
+
+def _list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    files = [f for f in os.listdir(PROFILE_DIR) if f.endswith(".prof")]
+    return sorted(files, reverse=True)
+
+
+def profile_callback(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _profiling_requested() or not _profile_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            result = profiler.runcall(func, *args, **kwargs)
+            _write_profile(func.__name__, time.perf_counter() - start, profiler)
+        finally:
+            _profile_lock.release()
+        return result
+
+    return wrapper
+
+
+def _top_functions(file_name: str):
+    stats = pstats.Stats(os.path.join(PROFILE_DIR, file_name))
+    # sort by cumulative time, i.e. including the time spent in sub-calls
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        (f"{name} ({os.path.basename(path)}:{line})", cumulative_time)
+        for (path, line, name), (_, _, _, cumulative_time, _) in functions
+    ][:TOP_FUNCTIONS]
+
+
+def _index_page():
+    rows = []
+    for file_name in _list_profiles():
+        top = "".join(
+            f"<li>{cumulative_time * 1000:.1f} ms {html.escape(function)}</li>"
+            for function, cumulative_time in _top_functions(file_name)
+        )
+        rows.append(
+            f"<h3><a href='{URLS.PROFILES.value}/{html.escape(file_name)}'>"
+            f"{html.escape(file_name)}</a></h3><ol>{top}</ol>"
+        )
+    body = "".join(rows) or "<p>No profiles recorded yet.</p>"
+    return (
+        "<html><head><title>Profiles</title></head><body>"
+        "<h1>Recent callback profiles</h1>"
+        "<p>Each file is a pstats dump, open it with snakeviz or flameprof to "
+        "see the flame graph.</p>"
+        f"{body}</body></html>"
+    )
+
+
+def init_profiler(dash_app):
+    server = dash_app.server
+
+    @server.after_request
+    def _set_profile_cookie(response):
+        token = request.args.get("profile")
+        if _valid_token(token):
+            response.set_cookie(
+                TOKEN_COOKIE, token, max_age=TOKEN_MAX_AGE, httponly=True
+            )
+        return response
+
+    def _check_access():
+        if not _profiling_requested():
+            abort(404)
+
+    @server.route(URLS.PROFILES.value)
+    def _profiles_index():
+        _check_access()
+        return _index_page()
+
+    @server.route(f"{URLS.PROFILES.value}/<path:file_name>")
+    def _profiles_file(file_name):
+        _check_access()
+        return send_from_directory(
+            os.path.abspath(PROFILE_DIR), file_name, as_attachment=True
+        )
+
+
+if __name__ == "__main__":
+    # print a token to append to the page URL, e.g. /?profile=<token>
+    if not PROFILE_SECRET:
+        sys.exit("Set COMFORT_PROFILE_SECRET to generate a profiling token")
+    print(make_profile_token())
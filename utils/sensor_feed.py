@@ -0,0 +1,72 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import requests
+
+from utils.my_config_file import URLS
+
+# local producer of synthetic readings for the live dashboard, e.g.
+# COMFORT_STREAM_TOKEN=<token> python -m utils.sensor_feed --sensors 5 --rate 2
+
+
+def synthetic_readings(sensors: int, state: dict, rng):
+    # random walk of the conditions in a few rooms, starting near neutrality
+    readings = []
+    for index in range(sensors):
+        sensor = f"sensor-{index + 1}"
+        values = state.setdefault(
+            sensor, {"tdb": 24 + index * 0.5, "v": 0.1, "rh": 50, "t_rm": 22}
+        )
+        values["tdb"] = float(np.clip(values["tdb"] + rng.normal(0, 0.1), 18, 32))
+        values["v"] = float(np.clip(values["v"] + rng.normal(0, 0.02), 0, 1))
+        values["rh"] = float(np.clip(values["rh"] + rng.normal(0, 0.5), 20, 80))
+        readings.append(
+            {
+                "sensor": sensor,
+                "time": time.time(),
+                "tr": values["tdb"] + 0.5,
+                **values,
+            }
+        )
+    return readings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Send synthetic sensor readings to a running server."
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:9090")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("COMFORT_STREAM_TOKEN"),
+        help="token of the server, COMFORT_STREAM_TOKEN by default",
+    )
+    parser.add_argument("--sensors", type=int, default=5)
+    parser.add_argument(
+        "--rate", type=float, default=2, help="readings per second per sensor"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=0, help="seconds, 0 runs until stopped"
+    )
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("the server requires a token, set --token or COMFORT_STREAM_TOKEN")
+
+    rng = np.random.default_rng()
+    state = {}
+    start = time.monotonic()
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {args.token}"
+    while not args.duration or time.monotonic() - start < args.duration:
+        response = session.post(
+            args.url.rstrip("/") + URLS.STREAM_READINGS.value,
+            json={"readings": synthetic_readings(args.sensors, state, rng)},
+        )
+        response.raise_for_status()
+        time.sleep(1 / args.rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+
+from utils.metrics import record_cache
+
+# set COMFORT_CACHE=0 to disable the cache, e.g. while developing the charts
+CACHE_ENABLED = os.environ.get("COMFORT_CACHE", "1").lower() not in ("0", "false")
+# the files of the app are kept in a folder only its user can write to, the
+# cached values are unpickled when they are read
+DATA_DIR = os.environ.get(
+    "COMFORT_DATA_DIR", os.path.join(tempfile.gettempdir(), f"comfort-{os.getuid()}")
+)
+# the file is shared by all the worker processes running on the same machine
+CACHE_FILE = os.environ.get(
+    "COMFORT_CACHE_FILE", os.path.join(DATA_DIR, "comfort-cache.sqlite")
+)
+CACHE_MAX_BYTES = int(os.environ.get("COMFORT_CACHE_MAX_MB", 256)) * 1024 * 1024
+# after an eviction the cache is reduced to this fraction of the maximum size
+EVICTION_TARGET = 0.8
+
+_local = threading.local()
+
+
+def private_file(path: str):
+    # the folder is created for the user running the app, an existing folder or
+    # file is refused when another user owns it or can write to it
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, mode=0o700, exist_ok=True)
+    for name, is_type in ((folder, stat.S_ISDIR), (path, stat.S_ISREG)):
+        try:
+            status = os.lstat(name)
+        except FileNotFoundError:
+            continue
+        if (
+            not is_type(status.st_mode)
+            or status.st_uid != os.getuid()
+            or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+        ):
+            raise PermissionError(f"{name} is not private to the user of the app")
+    return path
+
+
+def _connection():
+    # sqlite connections cannot be shared across threads or forked processes
+    if getattr(_local, "pid", None) != os.getpid():
+        connection = sqlite3.connect(
+            private_file(CACHE_FILE), timeout=5, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)"
+        )
+        _local.connection = connection
+        _local.pid = os.getpid()
+    return _local.connection
+
+
+def scenario_hash(*args, **kwargs):
+    # canonical representation of the inputs: sorted keys and no whitespace
+    payload = json.dumps(
+        [args, kwargs], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get(key: str):
+    row = _connection().execute("SELECT value FROM cache WHERE key = ?", (key,))
+    row = row.fetchone()
+    if row is None:
+        return None
+    _connection().execute(
+        "UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key)
+    )
+    return pickle.loads(row[0])
+
+
+def put(key: str, value):
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    connection = _connection()
+    connection.execute(
+        "INSERT OR REPLACE INTO cache (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+        (key, data, len(data), time.time()),
+    )
+    (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+    if total > CACHE_MAX_BYTES:
+        _evict(connection, total)
+
+
+def _evict(connection, total: int):
+    # removes the least recently used entries
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        rows = connection.execute("SELECT key, size FROM cache ORDER BY accessed")
+        expired = []
+        for key, size in rows:
+            if total <= CACHE_MAX_BYTES * EVICTION_TARGET:
+                break
+            expired.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM cache WHERE key = ?", expired)
+        connection.execute("COMMIT")
+    except sqlite3.Error:
+        connection.execute("ROLLBACK")
+        raise
+
+
+def _source_hash(func):
+    # entries are invalidated when the module defining the function changes
+    with open(inspect.getsourcefile(func), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def shared_cache(func):
+    namespace = f"{func.__module__}.{func.__qualname__}:{_source_hash(func)}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not CACHE_ENABLED:
+            return func(*args, **kwargs)
+        key = f"{namespace}:{scenario_hash(*args, **kwargs)}"
+        try:
+            value = get(key)
+        except (sqlite3.Error, OSError, pickle.UnpicklingError):
+            value = None
+        record_cache("shared", value is not None)
+        if value is not None:
+            return value
+
+        value = func(*args, **kwargs)
+        try:
+            put(key, value)
+        except (sqlite3.Error, OSError):
+            # the cache is an optimisation, a locked or full database, or a
+            # file refused by private_file, is not an error
+            pass
+        return value
+
+    return wrapper
@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import urljoin, urlsplit
+
+import brotli
+import dash_bootstrap_components as dbc
+import dash_mantine_components as dmc
+import requests
+from flask import request, send_from_directory
+
+from utils.my_config_file import URLS
+
+# folder written by `python -m utils.static_assets`, see the Dockerfile
+VENDOR_DIR = os.environ.get(
+    "COMFORT_VENDOR_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "vendor"),
+)
+MANIFEST_FILE = "manifest.json"
+
+STYLESHEETS = [
+    dbc.themes.BOOTSTRAP,
+    "https://maxcdn.bootstrapcdn.com/font-awesome/4.7.0/css/font-awesome.min.css",
+    "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.3/css/all.min.css",
+    # include google fonts
+    "https://fonts.googleapis.com/css2?family=Inter:wght@100;200;300;400;500;900&display=swap",
+    "https://fonts.googleapis.com/css2?family=Open+Sans&display=swap",
+    # dash mantine stylesheets, same version as the installed components
+    *dmc.styles.ALL,
+]
+SCRIPTS = ["https://cdn.plot.ly/plotly-basic-2.26.2.min.js"]
+
+# google fonts only returns woff2 files to recent browsers
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+CSS_URL = re.compile(r"url\(\s*['\"]?([^'\")]+?)['\"]?\s*\)")
+# fonts in these formats are already compressed
+COMPRESSED_EXTENSIONS = (".woff", ".woff2", ".png", ".jpg", ".gif")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# the file names contain the hash of their content so they can be cached forever
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _fingerprint(name: str, content: bytes):
+    stem, extension = posixpath.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+
+
+def _write(output_dir: str, name: str, content: bytes):
+    file_name = _fingerprint(name, content)
+    with open(os.path.join(output_dir, file_name), "wb") as f:
+        f.write(content)
+    if not file_name.endswith(COMPRESSED_EXTENSIONS):
+        # mtime=0 so that rebuilding the same file gives the same archive
+        with open(os.path.join(output_dir, file_name + ".gz"), "wb") as f:
+            f.write(gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0))
+        with open(os.path.join(output_dir, file_name + ".br"), "wb") as f:
+            f.write(brotli.compress(content, quality=BROTLI_QUALITY))
+    return file_name
+
+
+def _download(session, url: str, output_dir: str, extension: str, vendored: dict):
+    # the same font is often referenced several times, e.g. once per weight
+    if url in vendored:
+        return vendored[url]
+    response = session.get(url, timeout=60)
+    response.raise_for_status()
+    content = response.content
+    name = posixpath.basename(urlsplit(url).path)
+    if not posixpath.splitext(name)[1]:
+        # e.g. fonts.googleapis.com/css2?family=...
+        name = f"{name}{extension}"
+
+    if name.endswith(".css"):
+        # the fonts and images referenced by the stylesheets are vendored too
+        # and the references rewritten to the fingerprinted file names
+        def vendor_reference(match):
+            reference = match.group(1)
+            if reference.startswith("data:"):
+                return match.group(0)
+            # keeps the query and fragment, e.g. font-awesome.eot?#iefix
+            path = re.split(r"[?#]", reference, maxsplit=1)[0]
+            file_name = _download(session, urljoin(url, path), output_dir, "", vendored)
+            return f"url({file_name}{reference[len(path):]})"
+
+        content = CSS_URL.sub(vendor_reference, content.decode()).encode()
+    vendored[url] = _write(output_dir, name, content)
+    return vendored[url]
+
+
+def build(output_dir: str = VENDOR_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    vendored = {}
+    manifest = {}
+    for url in STYLESHEETS:
+        manifest[url] = _download(session, url, output_dir, ".css", vendored)
+    for url in SCRIPTS:
+        manifest[url] = _download(session, url, output_dir, ".js", vendored)
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _load_manifest():
+    try:
+        with open(os.path.join(VENDOR_DIR, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+manifest = _load_manifest()
+
+
+def asset_urls(urls: list):
+    # falls back to the CDN when the assets have not been vendored, e.g. in development
+    return [
+        f"{URLS.VENDOR.value}/{manifest[url]}" if url in manifest else url
+        for url in urls
+    ]
+
+
+def init_static_assets(dash_app):
+    server = dash_app.server
+
+    @server.route(f"{URLS.VENDOR.value}/<path:file_name>")
+    def _vendor_file(file_name):
+        mimetype = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+        # serves the pre-compressed file with the best encoding the browser accepts
+        for encoding, extension in (("br", ".br"), ("gzip", ".gz")):
+            if request.accept_encodings[encoding] and os.path.isfile(
+                os.path.join(VENDOR_DIR, file_name + extension)
+            ):
+                response = send_from_directory(
+                    VENDOR_DIR, file_name + extension, mimetype=mimetype
+                )
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = send_from_directory(VENDOR_DIR, file_name, mimetype=mimetype)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+if __name__ == "__main__":
+    for url, file_name in build().items():
+        print(f"{file_name:<60}{url}")
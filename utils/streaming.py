@@ -0,0 +1,272 @@
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+import numpy as np
+from flask import Response, request, stream_with_context
+from pythermalcomfort.models import adaptive_ashrae
+
+from components.model_registry import MODEL_REGISTRY
+from utils.my_config_file import Config, ElementsIDs, Models, URLS
+from utils.shared_cache import DATA_DIR, private_file
+
+# the readings are kept in a SQLite file shared by the worker processes, the
+# producer and the dashboards are not necessarily served by the same worker
+STREAM_FILE = os.environ.get(
+    "COMFORT_STREAM_FILE", os.path.join(DATA_DIR, "comfort-stream.sqlite")
+)
+# the producers send "Authorization: Bearer <token>", the readings are refused
+# when it is not set
+STREAM_TOKEN = os.environ.get("COMFORT_STREAM_TOKEN")
+# fields of a reading -> input of the PMV model, met and clo are optional and
+# default to the values of the model inputs
+STREAM_INPUTS = {
+    "tdb": ElementsIDs.t_db_input.value,
+    "tr": ElementsIDs.t_r_input.value,
+    "v": ElementsIDs.v_input.value,
+    "rh": ElementsIDs.rh_input.value,
+    "met": ElementsIDs.met_input.value,
+    "clo": ElementsIDs.clo_input.value,
+}
+STREAM_REQUIRED = ("tdb", "tr", "v", "rh")
+STREAM_MODEL = Models.PMV_ashrae.name
+# an event stream holds a worker thread, it is closed after this time and the
+# browser reconnects with the id of the last event it received
+STREAM_MAX_SECONDS = 30
+STREAM_RETRY_MS = 1_000
+# event streams served at once by a worker, well below its gunicorn threads so
+# that the callbacks are still served. The streams above are refused with a
+# 503 and the browser tries again after STREAM_BUSY_RETRY_SECONDS
+STREAM_MAX_CONNECTIONS = int(
+    os.environ.get(
+        "COMFORT_STREAM_MAX_CONNECTIONS",
+        max(1, int(os.environ.get("GUNICORN_THREADS", 4)) // 4),
+    )
+)
+STREAM_BUSY_RETRY_SECONDS = 5
+# comment sent when there are no new readings, so that the proxies keep the
+# connection open
+STREAM_KEEP_ALIVE_SECONDS = 15
+
+_local = threading.local()
+
+
+def _connection():
+    # sqlite connections cannot be shared across threads or forked processes
+    if getattr(_local, "key", None) != (os.getpid(), STREAM_FILE):
+        connection = sqlite3.connect(
+            private_file(STREAM_FILE), timeout=5, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS readings ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, sensor TEXT, time REAL, "
+            "pmv REAL, ppd REAL, adaptive INTEGER)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS readings_sensor ON readings (sensor, seq)"
+        )
+        _local.connection = connection
+        _local.key = (os.getpid(), STREAM_FILE)
+    return _local.connection
+
+
+def compute_readings(readings: list):
+    # the new readings of all the sensors are computed in one call, the
+    # readings already in the buffers are never computed again
+    defaults = {
+        model_input.id: model_input.value
+        for model_input in Models[STREAM_MODEL].value.inputs
+    }
+    outputs = MODEL_REGISTRY[STREAM_MODEL].compute(
+        {
+            input_id: np.array(
+                [reading.get(name, defaults[input_id]) for reading in readings],
+                dtype=float,
+            )
+            for name, input_id in STREAM_INPUTS.items()
+        }
+    )
+    # the adaptive status is only known for the readings with the running
+    # mean outdoor temperature
+    t_rm = np.array([reading.get("t_rm", np.nan) for reading in readings], float)
+    with warnings.catch_warnings(record=True):
+        acceptable = adaptive_ashrae(
+            tdb=np.array([reading["tdb"] for reading in readings], dtype=float),
+            tr=np.array([reading["tr"] for reading in readings], dtype=float),
+            t_running_mean=t_rm,
+            v=np.array([reading["v"] for reading in readings], dtype=float),
+        ).acceptability_80
+    return [
+        (
+            str(reading["sensor"]),
+            float(reading.get("time", time.time())),
+            None if np.isnan(pmv) else float(pmv),
+            None if np.isnan(ppd) else float(ppd),
+            None if np.isnan(value) else int(ok),
+        )
+        for reading, pmv, ppd, value, ok in zip(
+            readings, outputs["pmv"], outputs["ppd"], t_rm, acceptable
+        )
+    ]
+
+
+def add_readings(readings: list):
+    if not isinstance(readings, list) or not readings:
+        raise ValueError("Expected a non-empty list of readings")
+    if len(readings) > Config.STREAM_MAX_READINGS.value:
+        raise ValueError(
+            f"Expected at most {Config.STREAM_MAX_READINGS.value:,} readings"
+        )
+    for reading in readings:
+        if not isinstance(reading, dict) or "sensor" not in reading:
+            raise ValueError("Each reading needs a sensor")
+        missing = [name for name in STREAM_REQUIRED if name not in reading]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+    try:
+        rows = compute_readings(readings)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid reading: {error}")
+
+    # each sensor keeps a ring buffer of its last readings
+    connection = _connection()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        # the sensors that have not sent a reading for the longest time are
+        # removed to make room for the new ones, in the transaction so that
+        # concurrent requests cannot keep more sensors than the limit
+        sensors = {row[0] for row in rows}
+        if len(sensors) > Config.STREAM_MAX_SENSORS.value:
+            raise ValueError(
+                f"Expected at most {Config.STREAM_MAX_SENSORS.value:,} sensors"
+            )
+        others = [
+            sensor
+            for (sensor,) in connection.execute(
+                "SELECT sensor FROM readings GROUP BY sensor ORDER BY MAX(seq) DESC"
+            )
+            if sensor not in sensors
+        ]
+        connection.executemany(
+            "DELETE FROM readings WHERE sensor = ?",
+            [
+                (sensor,)
+                for sensor in others[Config.STREAM_MAX_SENSORS.value - len(sensors) :]
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO readings (sensor, time, pmv, ppd, adaptive) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        connection.executemany(
+            "DELETE FROM readings WHERE sensor = ? AND seq <= ("
+            "SELECT seq FROM readings WHERE sensor = ? "
+            "ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+            [
+                (sensor, sensor, Config.STREAM_BUFFER_SIZE.value)
+                for sensor in {row[0] for row in rows}
+            ],
+        )
+        connection.execute("COMMIT")
+    except (sqlite3.Error, ValueError):
+        connection.execute("ROLLBACK")
+        raise
+    return len(rows)
+
+
+def readings_since(seq: int, sensor: str = None):
+    # new readings grouped by sensor, in columns, and the last sequence number
+    query = "SELECT seq, sensor, time, pmv, ppd, adaptive FROM readings WHERE seq > ?"
+    parameters = [seq]
+    if sensor is not None:
+        query += " AND sensor = ?"
+        parameters.append(sensor)
+    delta = {}
+    rows = _connection().execute(query + " ORDER BY seq", parameters)
+    for seq, name, *values in rows:
+        columns = delta.setdefault(
+            name, {"time": [], "pmv": [], "ppd": [], "adaptive": []}
+        )
+        for column, value in zip(columns.values(), values):
+            column.append(value)
+    return delta, seq
+
+
+def event_stream(seq: int, sensor: str = None, duration: float = STREAM_MAX_SECONDS):
+    # server-sent events, each event carries the readings added since the
+    # previous one, checked at Config.STREAM_PUSH_INTERVAL
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+    end = time.monotonic() + duration
+    last_event = time.monotonic()
+    while time.monotonic() < end:
+        delta, seq = readings_since(seq, sensor)
+        if delta:
+            yield f"id: {seq}\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n"
+            last_event = time.monotonic()
+        elif time.monotonic() - last_event > STREAM_KEEP_ALIVE_SECONDS:
+            yield ": keep-alive\n\n"
+            last_event = time.monotonic()
+        time.sleep(Config.STREAM_PUSH_INTERVAL.value)
+
+
+def _authorized():
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return (
+        bool(STREAM_TOKEN)
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(token.encode(), STREAM_TOKEN.encode())
+    )
+
+
+def init_streaming(dash_app):
+    server = dash_app.server
+    streams = threading.BoundedSemaphore(STREAM_MAX_CONNECTIONS)
+
+    @server.route(URLS.STREAM_READINGS.value, methods=["POST"])
+    def _readings():
+        if not _authorized():
+            return (
+                {"error": "Missing or invalid token"},
+                401,
+                {"WWW-Authenticate": "Bearer"},
+            )
+        body = request.get_json(silent=True)
+        try:
+            count = add_readings(
+                body.get("readings") if isinstance(body, dict) else body
+            )
+        except ValueError as error:
+            return {"error": str(error)}, 400
+        return {"accepted": count}
+
+    @server.route(URLS.STREAM_EVENTS.value)
+    def _events():
+        if not streams.acquire(blocking=False):
+            return (
+                {"error": "Too many event streams, try again later"},
+                503,
+                {"Retry-After": str(STREAM_BUSY_RETRY_SECONDS)},
+            )
+        # the browser sends the id of the last event it received when it
+        # reconnects, the first connection receives the whole buffers
+        try:
+            seq = int(
+                request.headers.get("Last-Event-ID") or request.args.get("since", 0)
+            )
+        except ValueError:
+            seq = 0
+        response = Response(
+            stream_with_context(event_stream(seq, request.args.get("sensor"))),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        # called by the server when the stream ends or the client disconnects
+        response.call_on_close(streams.release)
+        return response
@@ -37,6 +37,7 @@ class TextHome(Enum):
     functionality_selection = "Select functionality:"
     chart_selection = "Select chart:"
     speed_selection = "Speed:"
+    sensor_grid_upload = "Drop or select a CSV file with the columns x, y, tdb, tr, v, rh (SI units), one row per sensor"
 
 
 class TextWarning(Enum):
@@ -0,0 +1,27 @@
+import time
+
+from app import app
+from utils.load_test import FLOWS, PayloadBuilder
+from utils.metrics import DASH_CALLBACK_PATH, WARM_UP_HEADER
+
+# flows replayed before the workers are forked, together they run every model
+# and every implemented chart at least once
+WARM_UP_FLOWS = ["model_switch", "chart_switch"]
+
+
+def warm_up(dash_app):
+    # compiles the numba functions of pythermalcomfort, builds the matplotlib
+    # font cache and the Dash layout, so that the forked workers inherit them
+    start = time.perf_counter()
+    client = dash_app.server.test_client()
+    client.get("/")
+    client.get("/_dash-layout")
+    builder = PayloadBuilder(client.get("/_dash-dependencies").get_json())
+    for flow in WARM_UP_FLOWS:
+        for payload in FLOWS[flow](builder):
+            client.post(DASH_CALLBACK_PATH, json=payload, headers={WARM_UP_HEADER: "1"})
+    print(f"Warm-up completed in {time.perf_counter() - start:.1f} s")
+
+
+warm_up(app)
+server = app.server